@@ -1,19 +1,24 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-from datetime import datetime
 import pandas as pd
-import json
+import os
+import tempfile
+from collections import defaultdict
 from pathlib import Path
+from typing import Dict, Tuple
 
 # P1 imports
 from p1_system import WildfireResponseSystem
-from p1_models import WildfireEvent, Severity
+from p1_models import WildfireEvent, Severity, event_sort_key
 
 # P2 imports
 from p2_model import WildfirePredictor
 from p2_data_prep import prepare_data
 
+from json_provider import OrjsonProvider, dumps_bytes, parse_request_json
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
 OUTPUT_DIR = Path("output")
@@ -23,6 +28,31 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 # Global predictor instance for P2
 predictor = None
 
+# Expected /api/predict input columns w/ dtypes, so pandas skips per-column inference.
+# Weather inputs only carry a few significant digits so float32 is plenty;
+# coordinates stay float64 since they're used to identify locations.
+_ENV_DTYPES = {
+    'timestamp': 'datetime64[ns]',
+    'temperature': 'float32',
+    'humidity': 'float32',
+    'wind_speed': 'float32',
+    'precipitation': 'float32',
+    'vegetation_index': 'float32',
+    'human_activity_index': 'float32',
+    'latitude': 'float64',
+    'longitude': 'float64'
+}
+
+# Every /api/predict record needs all of these
+_ENV_FIELDS = frozenset(_ENV_DTYPES)
+
+# Prediction outputs downcast before serializing
+FLOAT32_COLUMNS = ['fire_probability', 'temperature', 'humidity', 'wind_speed', 'FWI', 'DSR']
+
+# Columns pulled out of the high-risk frame when building /api/predict responses
+PREDICTION_COLUMNS = ['time', 'latitude', 'longitude', 'fire_probability',
+                      'temperature', 'humidity', 'wind_speed', 'FWI', 'DSR']
+
 def initialize_predictor():
     """Initialize the predictor if not already initialized"""
     global predictor
@@ -34,47 +64,110 @@ def initialize_predictor():
             return False
     return True
 
+# Mode for published output files - what a plain open() would give under this
+# process's umask (os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_OUTPUT_FILE_MODE = 0o666 & ~_UMASK
+
+# Raw bytes of the output json files, keyed by path -> ((mtime_ns, size), bytes)
+_FILE_CACHE: Dict[Path, Tuple[Tuple[int, int], bytes]] = {}
+
+def read_cached_json(path: Path) -> bytes:
+    """Return a json file's raw bytes, only re-reading it once it changes on disk"""
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _FILE_CACHE.get(path)
+    if cached is None or cached[0] != version:
+        cached = (version, path.read_bytes())
+        _FILE_CACHE[path] = cached
+    return cached[1]
+
+def stream_predictions(predictions, output_file: Path):
+    """Yield {"predictions": {...}} json one date bucket at a time, mirroring it to output_file"""
+    # Own temp file per request, so concurrent requests never publish each other's
+    # half-written output; it's only renamed over output_file once complete
+    tmp = tempfile.NamedTemporaryFile(dir=output_file.parent, prefix=output_file.name + '.',
+                                      suffix='.tmp', delete=False)
+    client_gone = False
+    published = False
+    try:
+        with tmp as f:
+            for i, (date, records) in enumerate(predictions):
+                opening = b'{"predictions":{' if i == 0 else b','
+                chunk = opening + dumps_bytes(date) + b':' + dumps_bytes(records)
+                f.write(chunk)
+                if not client_gone:
+                    try:
+                        yield chunk
+                    except GeneratorExit:
+                        # client hung up - still finish the file so /api/predictions stays in sync
+                        client_gone = True
+            closing = b'}}' if predictions else b'{"predictions":{}}'
+            f.write(closing)
+        os.chmod(tmp.name, _OUTPUT_FILE_MODE)  # temp files are created 0600
+        os.replace(tmp.name, output_file)
+        published = True
+    finally:
+        if not published:
+            # failed part way (encoding error, disk full, ...) - don't leave the temp file behind
+            try:
+                os.unlink(tmp.name)
+            except FileNotFoundError:
+                pass
+    if not client_gone:
+        yield closing
+
 # P1 Routes
 @app.route('/api/p1/get_system_state', methods=['GET'])
 def get_system_state():
     try:
-        with open(OUTPUT_DIR / "system_state.json", 'r') as f:
-            system_state = json.load(f)
-        return jsonify(system_state), 200
+        # Already json on disk - serve the bytes as-is, no parse + re-encode
+        system_state = read_cached_json(OUTPUT_DIR / "system_state.json")
+        return Response(system_state, mimetype='application/json'), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/p1/final_report', methods=['GET'])
 def get_final_report():
     try:
-        with open(OUTPUT_DIR / "final_report.json", 'r') as f:
-            report = json.load(f)
-        return jsonify(report), 200
+        report = read_cached_json(OUTPUT_DIR / "final_report.json")
+        return Response(report, mimetype='application/json'), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 @app.route('/api/p1/process_uploaded_data', methods=['POST'])
 def process_uploaded_data():
     try:
-        data = request.json
+        data = parse_request_json(request)
         if not data or 'events' not in data:
             return jsonify({"error": "No data provided"}), 400
 
         # Create a new system instance for processing only (no file saving)
         custom_system = WildfireResponseSystem(enable_console_print=False)
         
-        # Convert the JSON data to WildfireEvent objects
-        for event_data in data['events']:
-            event = WildfireEvent(
-                timestamp=datetime.fromisoformat(event_data['timestamp']),
-                fire_start_time=datetime.fromisoformat(event_data['fire_start_time']),
+        # Parse every timestamp in one vectorized call instead of per event
+        events = data['events']
+        timestamps = pd.to_datetime(
+            [event_data['timestamp'] for event_data in events], format='ISO8601', cache=True
+        ).to_pydatetime()
+        fire_start_times = pd.to_datetime(
+            [event_data['fire_start_time'] for event_data in events], format='ISO8601', cache=True
+        ).to_pydatetime()
+        
+        # Convert the JSON data to WildfireEvent objects in a single pass
+        custom_system.events = [
+            WildfireEvent(
+                timestamp=timestamp,
+                fire_start_time=fire_start_time,
                 location=event_data['location'],
-                severity=Severity(event_data['severity'].lower())
+                severity=Severity.from_str(event_data['severity'])
             )
-            custom_system.events.append(event)
+            for event_data, timestamp, fire_start_time in zip(events, timestamps, fire_start_times)
+        ]
         
         # Sort and process events
-        custom_system.events.sort()
+        custom_system.events.sort(key=event_sort_key)
         custom_system.process_events()
         
         # Generate responses directly (without saving)
@@ -82,7 +175,7 @@ def process_uploaded_data():
             "system_state": {
                 "resources": custom_system.resource_pool.to_dict(),
                 "events": [event.to_dict() for event in custom_system.events],
-                "damage_costs": {sev.value: cost for sev, cost in custom_system.damage_costs.items()},
+                "damage_costs": {str(sev): cost for sev, cost in custom_system.damage_costs.items()},
                 "operational_costs": custom_system.operational_costs,
                 "missed_response_costs": custom_system.missed_response_costs,
                 "statistics": custom_system.statistics
@@ -104,9 +197,9 @@ def get_predictions():
         if not prediction_file.exists():
             return jsonify({"error": "No predictions available"}), 404
             
-        with open(prediction_file, 'r') as f:
-            predictions = json.load(f)
-        return jsonify(predictions), 200
+        # Written by /api/predict as compact json - serve it without re-parsing
+        predictions = read_cached_json(prediction_file)
+        return Response(predictions, mimetype='application/json'), 200
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -120,12 +213,28 @@ def make_prediction():
             return jsonify({"error": "Model not found. Please train the model first."}), 500
 
         # Get data from request
-        data = request.json
+        data = parse_request_json(request)
         if not data:
             return jsonify({"error": "No data provided"}), 400
 
+        records = data.get('environmental_data')
+        if not isinstance(records, list):
+            return jsonify({"error": "environmental_data must be a list of records"}), 400
+
+        # from_records would fill absent keys w/ NaN and predict on them silently
+        missing = set()
+        for record in records:
+            missing.update(_ENV_FIELDS.difference(record))
+        if missing:
+            return jsonify({
+                "error": "Missing required fields in environmental_data",
+                "missing_fields": [field for field in _ENV_DTYPES if field in missing]
+            }), 400
+
         # Convert JSON to DataFrame
-        env_df = pd.DataFrame(data['environmental_data'])
+        env_df = pd.DataFrame.from_records(
+            records, columns=list(_ENV_DTYPES)
+        ).astype(_ENV_DTYPES, copy=False)
         
         # Prepare data and make predictions
         prepared_df = prepare_data(env_df, None)
@@ -135,36 +244,41 @@ def make_prediction():
         high_risk = predictions_df[predictions_df['fire_probability'] >= 0.90].copy()
         high_risk['timestamp'] = pd.to_datetime(high_risk['timestamp'])
         
-        # Format response
-        response = {"predictions": {}}
+        # float32 is plenty for risk/weather values - half the bytes to walk and
+        # orjson writes the shortest float32 repr, so the json comes out shorter too
+        high_risk[FLOAT32_COLUMNS] = high_risk[FLOAT32_COLUMNS].astype('float32', copy=False)
         
-        # Group predictions by date
-        for date, group in high_risk.groupby(high_risk['timestamp'].dt.date.astype(str)):
-            response["predictions"][date] = []
-            
-            for _, row in group.iterrows():
-                prediction = {
-                    "time": row['timestamp'].strftime('%H:%M:%S'),
-                    "location": {
-                        "latitude": float(row['latitude']),
-                        "longitude": float(row['longitude'])
-                    },
-                    "risk_factors": {
-                        "fire_probability": float(row['fire_probability']),
-                        "temperature": float(row['temperature']),
-                        "humidity": float(row['humidity']),
-                        "wind_speed": float(row['wind_speed']),
-                        "fwi": float(row['FWI']),
-                        "dsr": float(row['DSR'])
-                    }
-                }
-                response["predictions"][date].append(prediction)
+        # Stringify timestamps once per column instead of once per row
+        # (numeric columns stay numpy scalars, orjson encodes those natively)
+        high_risk['date'] = high_risk['timestamp'].dt.strftime('%Y-%m-%d')
+        high_risk['time'] = high_risk['timestamp'].dt.strftime('%H:%M:%S')
         
-        # Save predictions to file
-        with open(OUTPUT_DIR / "predictions.json", 'w') as f:
-            json.dump(response, f, indent=2)
+        # Bucket predictions by date in a single pass over the column arrays
+        predictions_by_date = defaultdict(list)
+        for date, time, lat, lng, prob, temp, hum, wind, fwi, dsr in zip(
+            *(high_risk[col].to_numpy() for col in ['date'] + PREDICTION_COLUMNS)
+        ):
+            predictions_by_date[date].append({
+                "time": time,
+                "location": {
+                    "latitude": lat,
+                    "longitude": lng
+                },
+                "risk_factors": {
+                    "fire_probability": prob,
+                    "temperature": temp,
+                    "humidity": hum,
+                    "wind_speed": wind,
+                    "fwi": fwi,
+                    "dsr": dsr
+                }
+            })
         
-        return jsonify(response), 200
+        # Stream the response one date bucket at a time (dates in order, same as
+        # the old groupby output) instead of encoding it all in one buffer
+        predictions = sorted(predictions_by_date.items())
+        return Response(stream_predictions(predictions, OUTPUT_DIR / "predictions.json"),
+                        mimetype='application/json'), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
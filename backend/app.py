@@ -1,7 +1,6 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import pandas as pd
-import io
 
 from p1_system import WildfireResponseSystem
 from p1_models import Severity
@@ -10,10 +9,13 @@ from p2_data_prep import prepare_data, create_fwi_features
 from p2_model import WildfirePredictor
 from p2_export import export_predictions_to_json_in_memory
 
+from json_provider import OrjsonProvider, parse_request_json
+
 import warnings
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
 # Cache a global predictor to avoid loading model each time
@@ -29,7 +31,7 @@ def get_final_report():
       }
     Returns final stats from WildfireResponseSystem
     """
-    data = request.get_json() or {}
+    data = parse_request_json(request) or {}
     
     raw_data = data.get('rawData', [])
     custom_resources = data.get('customResources', None)
@@ -42,15 +44,11 @@ def get_final_report():
         enable_console_print=False
     )
     
-    # Convert rawData -> CSV in memory
-    if raw_data:
-        csv_buffer = io.StringIO()
-        pd.DataFrame(raw_data).to_csv(csv_buffer, index=False)
-        csv_buffer.seek(0)
-    else:
+    if not raw_data:
         return jsonify({"error": "No raw data provided"}), 400
     
-    wildfire_system.load_data(csv_buffer)
+    # rawData goes straight into a DataFrame - no CSV round trip
+    wildfire_system.load_dataframe(pd.DataFrame(raw_data))
     wildfire_system.process_events()
     final_report = wildfire_system.generate_report()
 
@@ -73,19 +71,15 @@ def get_predictions():
     """
     global WILDFIRE_PREDICTOR
     
-    data = request.get_json(silent=True) or {}
+    data = parse_request_json(request, silent=True) or {}
     raw_data = data.get('rawData', [])
     probability_threshold = float(data.get('probability_threshold', 0.90))
 
     if not raw_data:
         return jsonify({"error": "No rawData provided"}), 400
 
-    # Convert list-of-dicts -> CSV -> DataFrame
-    csv_buffer = io.StringIO()
-    pd.DataFrame(raw_data).to_csv(csv_buffer, index=False)
-    csv_buffer.seek(0)
-
-    future_df = pd.read_csv(csv_buffer)
+    # Convert list-of-dicts -> DataFrame
+    future_df = pd.DataFrame(raw_data)
     future_df['timestamp'] = pd.to_datetime(future_df['timestamp'], errors='coerce')
     
     # Create FWI features if needed
@@ -0,0 +1,51 @@
+# orjson backed json provider for the flask apps
+# swaps out flask's stdlib encoder so big prediction payloads encode in C
+from datetime import date, datetime
+from decimal import Decimal
+
+import orjson
+from flask.json.provider import JSONProvider
+from werkzeug.exceptions import BadRequest
+
+# numpy scalars/arrays are encoded natively, no float() casts needed
+# note: orjson also encodes enums natively by value, and has no passthrough
+# option for them - a bare Severity would come out as 1/2/3, so payloads
+# carry str(severity) ("low"/"medium"/"high"), see WildfireEvent.to_dict
+# non-str dict keys get coerced to strings like the stdlib encoder does
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    # fallback for types orjson doesn't handle on its own
+    # (pd.Timestamp is a datetime subclass so it lands here too)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj, option: int = 0) -> bytes:
+    """serialize straight to utf-8 bytes w/ the shared options"""
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS | option)
+
+
+def parse_request_json(req, silent: bool = False):
+    """parse a request body w/ orjson - stand-in for request.get_json()"""
+    # cache=False: the body is only read once so don't keep a copy around
+    try:
+        return orjson.loads(req.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        if silent:
+            return None
+        raise BadRequest("Failed to decode JSON object")
+
+
+class OrjsonProvider(JSONProvider):
+    """drop-in replacement for flask's default json provider"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
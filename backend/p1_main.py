@@ -29,8 +29,9 @@ def main():
        enable_console_print=True  # helps w/debugging
    )
    
-   # fallback to defaults (overwrite the code above)
-   system = WildfireResponseSystem(enable_console_print=True)
+   # fallback to defaults (overwrite the code above) - also streams each
+   # response to output/event_log.jsonl so a long run can be tailed
+   system = WildfireResponseSystem(enable_console_print=True, stream_event_log=True)
 
    system.load_data("data/current_wildfiredata.csv")
    system.process_events()
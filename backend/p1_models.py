@@ -3,22 +3,40 @@
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
-from enum import Enum
+from enum import IntEnum
 
-class Severity(Enum):
-   LOW = "low"
-   MEDIUM = "medium" 
-   HIGH = "high"
+class Severity(IntEnum):
+   # int values double as the priority, so sort keys compare plain ints in C
+   LOW = 1
+   MEDIUM = 2
+   HIGH = 3
+   
+   def __str__(self) -> str:
+       # "low"/"medium"/"high" - the string form used in csv + json
+       return self.name.lower()
+
+   @classmethod
+   def from_str(cls, value: str) -> "Severity":
+       # parses "low"/"Medium"/"HIGH" etc, common casings skip the .lower()
+       severity = _SEVERITY_BY_NAME.get(value)
+       if severity is None:
+           severity = _SEVERITY_BY_NAME.get(value.lower())
+           if severity is None:
+               raise ValueError(f"{value!r} is not a valid Severity")
+       return severity
    
    def priority(self) -> int:
        # maps severity to priority number
-       return {
-           Severity.LOW: 1,
-           Severity.MEDIUM: 2,
-           Severity.HIGH: 3
-       }[self]
+       return int(self)
+
+# lookup table for from_str - plain dict get, no enum machinery
+_SEVERITY_BY_NAME = {
+   name: sev
+   for sev in Severity
+   for name in (str(sev), sev.name, str(sev).title())
+}
 
-@dataclass
+@dataclass(slots=True)
 class ResourceType:
    name: str
    deployment_time: timedelta
@@ -53,7 +71,8 @@ class ResourceType:
        # calculates remaining available units
        return self.total_units - self.used_units
 
-@dataclass
+# slots: no per-instance __dict__, these get created + sorted by the thousands
+@dataclass(slots=True)
 class WildfireEvent:
    timestamp: datetime
    fire_start_time: datetime
@@ -68,14 +87,12 @@ class WildfireEvent:
            "timestamp": self.timestamp.isoformat(),
            "fire_start_time": self.fire_start_time.isoformat(),
            "location": self.location,
-           "severity": self.severity.value,
+           "severity": str(self.severity),
            "handled": self.handled,
            "assigned_resource": self.assigned_resource
        }
 
-   def __lt__(self, other):
-       # prioritizes by timestamp then severity
-       # used for sorting events queue
-       if self.timestamp != other.timestamp:
-           return self.timestamp < other.timestamp
-       return self.severity.priority() > other.severity.priority()
\ No newline at end of file
+def event_sort_key(event: WildfireEvent) -> Tuple[datetime, int]:
+   # queue order: by timestamp, then higher severity first
+   # plain tuple of ints/datetimes so list.sort never calls back into python
+   return (event.timestamp, -event.severity)
\ No newline at end of file
@@ -1,6 +1,7 @@
 # manages resource pool and assignments for wildfire response
 # tweak default values based on field testing feedback
-from typing import Dict, Optional
+from dataclasses import replace
+from typing import Dict, List, Optional
 from p1_models import ResourceType, Severity
 
 class ResourcePool:
@@ -33,17 +34,29 @@ class ResourcePool:
        }
    }
 
+   # parsed once at class load so each pool just copies them
+   _DEFAULT_RESOURCE_TYPES = {
+       name: ResourceType.from_dict(name, config)
+       for name, config in DEFAULT_RESOURCES.items()
+   }
+
    def __init__(self, custom_resources: Optional[Dict] = None):
-       self.resources = {}
-       resources_config = self.DEFAULT_RESOURCES.copy()
+       # shallow copies of the defaults - no re-parsing configs/timedeltas
+       self.resources = {
+           name: replace(resource)
+           for name, resource in self._DEFAULT_RESOURCE_TYPES.items()
+       }
        
        # override defaults w custom configs if provided
        if custom_resources:
-           resources_config.update(custom_resources)
-       
-       # init all resource types
-       for name, config in resources_config.items():
-           self.resources[name] = ResourceType.from_dict(name, config)
+           for name, config in custom_resources.items():
+               self.resources[name] = ResourceType.from_dict(name, config)
+
+       # the ResourceType objects are the only place unit counts live (anything
+       # may bump used_units), only the static costs get turned into a
+       # cheapest-first order of names up front
+       resources = self.resources
+       self._by_cost = sorted(resources, key=lambda name: resources[name].cost)  # stable
 
    def to_dict(self):
        # converts pool to dict format for storage
@@ -51,21 +64,29 @@ class ResourcePool:
 
    def get_best_available_resource(self, severity: Severity) -> Optional[str]:
        # finds cheapest available resource for given severity
-       available_resources = [
-           (name, resource) for name, resource in self.resources.items()
-           if resource.available_units > 0
-       ]
-
-       if not available_resources:
-           return None
+       # walks the precomputed cost order and stops at the first free one
+       resources = self.resources
+       for name in self._by_cost:
+           resource = resources[name]
+           if resource.used_units < resource.total_units:
+               return name
+       return None
 
-       sorted_resources = sorted(available_resources, key=lambda x: x[1].cost)
-       return sorted_resources[0][0]
+   def plan_assignments(self, n_events: int) -> List[Optional[str]]:
+       # works out the resource for each of the next n events in one go
+       # units never free up and costs are fixed, so the greedy cheapest-first
+       # picks are just the cost order w/ each resource repeated per free unit
+       plan = []
+       for name in self._by_cost:
+           free = min(max(self.resources[name].available_units, 0), n_events - len(plan))
+           plan += [name] * free
+       
+       return plan + [None] * (n_events - len(plan))
 
    def assign_resource(self, resource_name: str) -> bool:
        # tries to assign a resource, returns success status
        resource = self.resources[resource_name]
-       if resource.available_units > 0:
+       if resource.used_units < resource.total_units:
            resource.used_units += 1
            return True
        return False
@@ -1,50 +1,112 @@
 # main wildfire response system implementation
 # handles event processing, resource management & reporting
 # using default costs for now - update based on 2024 data
+import sys
+import numpy as np
+import orjson
 import pandas as pd
-import json
 from pathlib import Path
 from typing import Dict, Optional
-from p1_models import Severity, WildfireEvent 
+from p1_models import Severity, WildfireEvent, event_sort_key
 from p1_resources import ResourcePool
 
+# starting damage costs - can override w/ custom values
+DEFAULT_DAMAGE_COSTS = {
+   Severity.LOW: 50000,      # baseline damage estimate
+   Severity.MEDIUM: 100000,   # 2x low severity
+   Severity.HIGH: 200000     # 4x low severity
+}
+
 class WildfireResponseSystem:
-   def __init__(self, custom_resources: Optional[Dict] = None, custom_damage_costs: Optional[Dict] = None, enable_console_print: bool = True):
+   def __init__(self, custom_resources: Optional[Dict] = None, custom_damage_costs: Optional[Dict] = None, enable_console_print: bool = True, stream_event_log: bool = False):
        self.enable_console_print = enable_console_print
+       # opt in: also append each response to output/event_log.jsonl as it's handled
+       self.stream_event_log = stream_event_log
        self.resource_pool = ResourcePool(custom_resources)
        
-       # starting damage costs - can override w/ custom values
-       default_damage_costs = {
-           Severity.LOW: 50000,      # baseline damage estimate
-           Severity.MEDIUM: 100000,   # 2x low severity
-           Severity.HIGH: 200000     # 4x low severity
-       }
-       
+       damage_costs = {}
        if custom_damage_costs:
            for severity in Severity:
-               if severity.value in custom_damage_costs:
-                   default_damage_costs[severity] = custom_damage_costs[severity.value]
+               if str(severity) in custom_damage_costs:
+                   damage_costs[severity] = custom_damage_costs[str(severity)]
        
-       # tracking vars for system state
-       self.damage_costs = default_damage_costs
-       self.operational_costs = 0  # running total of resource costs
-       self.missed_response_costs = 0  # damage from unhandled fires
-       self.statistics = {
-           "addressed": {sev.value: 0 for sev in Severity},  # successful responses
-           "missed": {sev.value: 0 for sev in Severity}     # failed responses
-       }
-       self.events = []  # queue of fire events
-       self.event_log = []  # history of responses
+       self.damage_costs = damage_costs
        
        # setup output directory
        self.output_dir = Path("output")
        self.output_dir.mkdir(exist_ok=True)
+       self.reset_state()
+
+   @property
+   def damage_costs(self):
+       # a copy - assign a new dict to change costs, so the lookup table
+       # below can't go stale
+       return dict(self._damage_costs)
+
+   @damage_costs.setter
+   def damage_costs(self, costs):
+       # severities missing from costs keep their default
+       self._damage_costs = {**DEFAULT_DAMAGE_COSTS, **costs}
+       # same costs as a tuple indexed by the severity int (slot 0 unused), so a
+       # missed response is a plain index instead of an enum-keyed dict lookup
+       self._damage_cost_lut = (0,) + tuple(self._damage_costs[sev] for sev in Severity)
+
+   def reset_state(self):
+       # tracking vars for system state - also used to recycle a copied system
+       self.operational_costs = 0  # running total of resource costs
+       self.missed_response_costs = 0  # damage from unhandled fires
+       # response counts indexed by the severity int (slot 0 unused)
+       self._addressed = [0] * (len(Severity) + 1)  # successful responses
+       self._missed = [0] * (len(Severity) + 1)     # failed responses
+       self.events = []  # queue of fire events
+       # history of responses, kept column-wise (one entry per handled event)
+       # and only turned into dicts when the log gets saved
+       self._log_events = []
+       self._log_resources = []  # resource name, None for a missed response
+       self._log_costs = []      # operational cost or damage cost
+       self._console = []  # console lines for the event being processed
+       if self.stream_event_log:
+           # the jsonl log mirrors the in-memory one, so it starts over w/ it
+           (self.output_dir / "event_log.jsonl").write_bytes(b"")
+
+   @property
+   def statistics(self):
+       # per severity response counts, keyed "low"/"medium"/"high"
+       return {
+           "addressed": {str(sev): self._addressed[sev] for sev in Severity},
+           "missed": {str(sev): self._missed[sev] for sev in Severity}
+       }
+
+   @staticmethod
+   def _log_entry(event, resource, cost):
+       # one event log record, as written to event_log.json / .jsonl
+       if resource is not None:
+           return {
+               "timestamp": event.timestamp.isoformat(),
+               "severity": str(event.severity),
+               "response": "SUCCESS",
+               "resource": resource,
+               "cost": cost
+           }
+       return {
+           "timestamp": event.timestamp.isoformat(),
+           "severity": str(event.severity),
+           "response": "MISSED",
+           "damage_cost": cost
+       }
+
+   @property
+   def event_log(self):
+       # history of responses as the list of dicts written to event_log.json
+       return [
+           self._log_entry(event, resource, cost)
+           for event, resource, cost in zip(self._log_events, self._log_resources, self._log_costs)
+       ]
 
    def save_event_log(self):
-       # saves full event history to json
+       # saves full event history to json (orjson, same indent=2 layout as json.dump)
        output_path = self.output_dir / "event_log.json"
-       with open(output_path, 'w') as f:
-           json.dump(self.event_log, f, indent=2)
+       output_path.write_bytes(orjson.dumps(self.event_log, option=orjson.OPT_INDENT_2))
        if self.enable_console_print:
            print(f"\nEvent log saved to: {output_path}")
 
@@ -53,39 +115,54 @@ class WildfireResponseSystem:
        system_state = {
            "resources": self.resource_pool.to_dict(),
            "events": [event.to_dict() for event in self.events],
-           "damage_costs": {sev.value: cost for sev, cost in self.damage_costs.items()},
+           "damage_costs": {str(sev): cost for sev, cost in self._damage_costs.items()},
            "operational_costs": self.operational_costs,
            "missed_response_costs": self.missed_response_costs,
            "statistics": self.statistics
        }
        
        output_path = self.output_dir / "system_state.json"
-       with open(output_path, 'w') as f:
-           json.dump(system_state, f, indent=2)
+       output_path.write_bytes(orjson.dumps(system_state, option=orjson.OPT_INDENT_2))
        if self.enable_console_print:
            print(f"System state saved to: {output_path}")
 
    def save_final_report(self, report_data: Dict):
        # writes final analysis to file
        output_path = self.output_dir / "final_report.json"
-       with open(output_path, 'w') as f:
-           json.dump(report_data, f, indent=2)
+       output_path.write_bytes(orjson.dumps(report_data, option=orjson.OPT_INDENT_2))
        if self.enable_console_print:
            print(f"Final report saved to: {output_path}")
 
    def load_data(self, filepath: str):
-       # reads events from csv into system
-       df = pd.read_csv(filepath)
-       for _, row in df.iterrows():
-           event = WildfireEvent(
-               timestamp=pd.to_datetime(row['timestamp']),
-               fire_start_time=pd.to_datetime(row['fire_start_time']),
-               location=(row['location']),
-               severity=Severity(row['severity'].lower())
+       # reads events from csv into system - timestamps parsed by the csv reader
+       # in one go, then the same column-wise path as api payloads
+       df = pd.read_csv(filepath, engine='pyarrow', parse_dates=['timestamp', 'fire_start_time'])
+       self.load_dataframe(df)
+
+   def load_dataframe(self, df: pd.DataFrame):
+       # builds events from a dataframe (api payloads, or a csv via load_data)
+       # coercions run column-wise so there's no csv round trip or per row parsing
+       timestamps = pd.to_datetime(df['timestamp']).tolist()
+       fire_start_times = pd.to_datetime(df['fire_start_time']).tolist()
+       # severity strings are parsed once per distinct value (factorize hashes
+       # the column in C), then the members get fanned back out by code
+       codes, names = pd.factorize(df['severity'], use_na_sentinel=False)
+       parsed = np.array([Severity.from_str(name) for name in names], dtype=object)
+       severities = parsed[codes].tolist()
+
+       self.events.extend(
+           WildfireEvent(
+               timestamp=timestamp,
+               fire_start_time=fire_start_time,
+               location=location,
+               severity=severity
            )
-           self.events.append(event)
-       
-       self.events.sort()  # sort by priority order
+           for timestamp, fire_start_time, location, severity in zip(
+               timestamps, fire_start_times, df['location'].tolist(), severities
+           )
+       )
+
+       self.events.sort(key=event_sort_key)  # sort by priority order
 
    def process_events(self):
        # main event processing loop
@@ -93,36 +170,61 @@ class WildfireResponseSystem:
            print("\nReal-time Event Processing Log:")
            print("=" * 50)
        
-       for i, event in enumerate(self.events, 1):
-           if self.enable_console_print:
-               print(f"\nEvent {i} at {event.timestamp}:")
-               print(f"Severity: {event.severity.value.upper()}")
-               print(f"Location: {event.location}")
-               print("\nCurrent Resource Status:")
-           
-           self._print_resource_status()
+       # resource picks for the whole queue, worked out up front
+       planned_resources = self.resource_pool.plan_assignments(len(self.events))
+       
+       # each event's console output is collected and written in one go
+       console = self._console if self.enable_console_print else None
+       
+       # w/ stream_event_log, responses get appended to event_log.jsonl as they
+       # happen (one line each, across batches until reset_state) -
+       # event_log.json is still written in full once at the end
+       if self.stream_event_log:
+           with open(self.output_dir / "event_log.jsonl", 'ab') as log_file:
+               self._process_queue(planned_resources, console, log_file)
+       else:
+           self._process_queue(planned_resources, console, None)
+       
+       # save once the queue is done - rewriting the whole log after every
+       # event made the run O(n^2) in json output
+       self.save_event_log()
+       self.save_system_state()
+
+   def _process_queue(self, planned_resources, console, log_file):
+       # handles each queued event w/ its planned resource
+       for i, (event, resource_name) in enumerate(zip(self.events, planned_resources), 1):
+           if console is not None:
+               console.extend((
+                   f"\nEvent {i} at {event.timestamp}:",
+                   f"Severity: {event.severity.name}",
+                   f"Location: {event.location}",
+                   "\nCurrent Resource Status:"
+               ))
+               self._print_resource_status()
            
-           # try to find best available resource
-           resource_name = self.resource_pool.get_best_available_resource(event.severity)
+           # planned pick is the best available resource at this point
            self._handle_event(event, resource_name)
+           if log_file is not None:
+               entry = self._log_entry(event, self._log_resources[-1], self._log_costs[-1])
+               log_file.write(orjson.dumps(entry) + b"\n")
            
-           if self.enable_console_print:
-               print("\n" + "-" * 50)
-           
-           # save updates
-           self.save_event_log()
-           self.save_system_state()
+           if console is not None:
+               console.append("\n" + "-" * 50)
+               sys.stdout.write("\n".join(console) + "\n")
+               console.clear()
 
    def _print_resource_status(self):
-       # helper to show resource availability
+       # helper to show resource availability (queued w/ the event's output)
        if not self.enable_console_print:
            return
            
        status = self.resource_pool.get_resource_status()
        for resource_name, stats in status.items():
-           print(f"  {resource_name.replace('_', ' ').title()}:")
-           print(f"    Available: {stats['available']}/{stats['total']}")
-           print(f"    Used: {stats['used']}")
+           self._console.extend((
+               f"  {resource_name.replace('_', ' ').title()}:",
+               f"    Available: {stats['available']}/{stats['total']}",
+               f"    Used: {stats['used']}"
+           ))
 
    def _handle_event(self, event, resource_name):
        # processes single fire event
@@ -137,46 +239,43 @@ class WildfireResponseSystem:
        event.handled = True
        event.assigned_resource = resource_name
        
-       self.statistics["addressed"][event.severity.value] += 1
+       self._addressed[event.severity] += 1
        self.operational_costs += resource.cost
        
-       self.event_log.append({
-           "timestamp": event.timestamp.isoformat(),
-           "severity": event.severity.value,
-           "response": "SUCCESS", 
-           "resource": resource.name,
-           "cost": resource.cost
-       })
+       self._log_events.append(event)
+       self._log_resources.append(resource.name)
+       self._log_costs.append(resource.cost)
        
        if self.enable_console_print:
-           print(f"\nResponse Decision:")
-           print(f"[SUCCESS] Fire addressed using {resource.name}")
-           print(f"  Deployment Time: {resource.deployment_time}")
-           print(f"  Operational Cost: ${resource.cost:,}")
+           self._console.extend((
+               "\nResponse Decision:",
+               f"[SUCCESS] Fire addressed using {resource.name}",
+               f"  Deployment Time: {resource.deployment_time}",
+               f"  Operational Cost: ${resource.cost:,}"
+           ))
 
    def _handle_missed_response(self, event):
        # handles case where no resources available
        event.handled = False
-       self.statistics["missed"][event.severity.value] += 1
-       damage_cost = self.damage_costs[event.severity]
+       self._missed[event.severity] += 1
+       damage_cost = self._damage_cost_lut[event.severity]
        self.missed_response_costs += damage_cost
        
-       self.event_log.append({
-           "timestamp": event.timestamp.isoformat(),
-           "severity": event.severity.value,
-           "response": "MISSED",
-           "damage_cost": damage_cost
-       })
+       self._log_events.append(event)
+       self._log_resources.append(None)
+       self._log_costs.append(damage_cost)
        
        if self.enable_console_print:
-           print(f"\nResponse Decision:")
-           print(f"[FAILED] No resources available - MISSED RESPONSE")
-           print(f"  Estimated Damage Cost: ${damage_cost:,}")
+           self._console.extend((
+               "\nResponse Decision:",
+               "[FAILED] No resources available - MISSED RESPONSE",
+               f"  Estimated Damage Cost: ${damage_cost:,}"
+           ))
 
    def generate_report(self):
        # creates final analysis report
-       total_addressed = sum(self.statistics["addressed"].values())
-       total_missed = sum(self.statistics["missed"].values())
+       total_addressed = sum(self._addressed)
+       total_missed = sum(self._missed)
        
        if self.enable_console_print:
            self._print_summary_report(total_addressed, total_missed)
@@ -243,12 +342,12 @@ class WildfireResponseSystem:
        print("\nResponse Breakdown by Severity:")
        print("-----------------------------")
        for severity in Severity:
-           addressed = self.statistics["addressed"][severity.value]
-           missed = self.statistics["missed"][severity.value]
+           addressed = self._addressed[severity]
+           missed = self._missed[severity]
            total = addressed + missed
            if total > 0:
                success_rate = (addressed / total) * 100
-               print(f"\n{severity.value.upper()} Severity Fires:")
+               print(f"\n{severity.name} Severity Fires:")
                print(f"  Addressed: {addressed}")
                print(f"  Missed: {missed}")
                print(f"  Success Rate: {success_rate:.1f}%")
\ No newline at end of file
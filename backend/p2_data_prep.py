@@ -1,90 +1,152 @@
 # fire weather index (FWI) calculation module
 # formulas based on canadian FWI standards
 # added vectorization for better performance
+import os
+from pathlib import Path
+import numpy as np
 import pandas as pd
 import p2_fwi as fwi
 
+# rows per read_csv chunk in prepare_data
+CSV_CHUNK_SIZE = 100_000
+# prepared frames get cached next to the env csv as <name>.fwi.parquet
+FWI_CACHE_SUFFIX = '.fwi.parquet'
+# bump whenever prepare_data / the FWI math changes its output, so old
+# caches stop matching
+FWI_CACHE_VERSION = 2
+
 def create_fwi_features(df):
    """handles sequential FWI system calculations for dataset"""
    
    # need timestamp order for proper calcs
    df = df.sort_values('timestamp')
    
-   # init starting conditions from standard values
-   df['FFMC'] = 85.0  # fine fuel moisture code
-   df['DMC'] = 6.0    # duff moisture code  
-   df['DC'] = 15.0    # drought code
-   
-   # need months for seasonal adjustments
-   months = df['timestamp'].dt.month
+   # init starting conditions from standard values - only row 0 seeds the
+   # recurrence below, it fills in the rest of each array
+   n = len(df)
+   ffmc = np.empty(n)
+   dmc = np.empty(n)
+   dc = np.empty(n)
+   ffmc[:1] = 85.0  # fine fuel moisture code
+   dmc[:1] = 6.0    # duff moisture code
+   dc[:1] = 15.0    # drought code
    
-   # gotta do these ones in order since they depend on prev values
-   for i in range(1, len(df)):
-       # fine fuel moisture - fast response
-       df.iloc[i, df.columns.get_loc('FFMC')] = fwi.calculate_ffmc_vectorized(
-           df.iloc[i]['temperature'], 
-           df.iloc[i]['humidity'],
-           df.iloc[i]['wind_speed'],
-           df.iloc[i]['precipitation'],
-           df.iloc[i-1]['FFMC']
-       )
-       
-       # duff layer moisture - medium response
-       df.iloc[i, df.columns.get_loc('DMC')] = fwi.calculate_dmc_vectorized(
-           df.iloc[i]['temperature'],
-           df.iloc[i]['humidity'],
-           df.iloc[i]['precipitation'],
-           df.iloc[i-1]['DMC'],
-           months.iloc[i]
-       )
-       
-       # deep soil moisture - slow response
-       df.iloc[i, df.columns.get_loc('DC')] = fwi.calculate_dc_vectorized(
-           df.iloc[i]['temperature'],
-           df.iloc[i]['precipitation'],
-           df.iloc[i-1]['DC'],
-           months.iloc[i]
-       )
+   # gotta do these ones in order since they depend on prev values - one pass
+   # over plain arrays, rows 1.. filled in from the row before
+   if n:
+       # own float32 copy of the weather columns (readings only carry 2-3
+       # significant digits), clipped in place once for all 3 codes. the
+       # weather only terms get precomputed at that width, the recurrence
+       # itself still steps in python floats
+       weather = df[['temperature', 'humidity', 'wind_speed', 'precipitation']].to_numpy(dtype=np.float32, copy=True)
+       temp, rh, wind, rain = weather.T
+       fwi.clip_weather(temp, rh, wind, rain)
+       months = df['timestamp'].dt.month.to_numpy()  # for seasonal adjustments
+       fwi.fwi_recurrence(temp, rh, wind, rain, months, ffmc, dmc, dc)
+   df['FFMC'] = ffmc
+   df['DMC'] = dmc
+   df['DC'] = dc
    
    # these ones can be done all at once - no dependencies
-   df['ISI'] = fwi.calculate_isi(df['FFMC'], df['wind_speed'])  # spread index
-   df['BUI'] = fwi.calculate_bui(df['DMC'], df['DC'])          # buildup index 
-   df['FWI'] = fwi.calculate_fwi(df['ISI'], df['BUI'])         # fire weather idx
-   df['DSR'] = fwi.calculate_dsr(df['FWI'])                    # daily severity
+   isi, bui, fwi_idx, dsr = fwi.calculate_indices(ffmc, df['wind_speed'].to_numpy(dtype=np.float64), dmc, dc)
+   df['ISI'] = isi      # spread index
+   df['BUI'] = bui      # buildup index 
+   df['FWI'] = fwi_idx  # fire weather idx
+   df['DSR'] = dsr      # daily severity
    
    return df
 
-def prepare_data(env_data_path, fire_data_path):
-   """preps environmental and fire data for modeling"""
-   # load the env data first
-   env_df = pd.read_csv(env_data_path)
-   env_df['timestamp'] = pd.to_datetime(env_df['timestamp'])
+def _location_time(df):
+   """unique id for each location-time combo, packed into one int64
    
+   hour since epoch, then lat/lng at 4 decimals as ints (same buckets as the
+   old 'YYYY-mm-dd HH:00:00_lat_lng' strings). lat gets 21 bits and lng 22
+   after offsetting to non-negative, which leaves the hour ~119 years either
+   side of 1970"""
+   hours = df['timestamp'].to_numpy().astype('datetime64[h]').astype(np.int64)
+   lat = np.rint(df['latitude'].to_numpy(dtype=np.float64) * 10000).astype(np.int64) + 900_000
+   lng = np.rint(df['longitude'].to_numpy(dtype=np.float64) * 10000).astype(np.int64) + 1_800_000
+   return (hours << 43) + (lat << 22) + lng
+
+def _cache_key(*paths):
+   """mtime + size of every input file, changes whenever one is rewritten"""
+   parts = [f"v{FWI_CACHE_VERSION}"]
+   for path in paths:
+       if path is None:
+           parts.append('-')
+       else:
+           stat = os.stat(path)
+           parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+   return '|'.join(parts)
+
+def _read_cache(cache_path, key):
+   """cached frame for key, or None if theres no (usable) cache for it"""
+   if not cache_path.exists():
+       return None
+   try:
+       cached = pd.read_parquet(cache_path)
+   except Exception:
+       return None  # partly written / unreadable - just rebuild it
+   if cached.attrs.pop('fwi_cache_key', None) != key:
+       return None
+   return cached
+
+def _write_cache(df, cache_path, key):
+   """save df w/ its key in the parquet metadata (via attrs)"""
+   df.attrs['fwi_cache_key'] = key
+   try:
+       df.to_parquet(cache_path, compression='zstd')
+   except OSError:
+       pass  # read only data dir etc - caching is best effort
+   finally:
+       del df.attrs['fwi_cache_key']
+
+def prepare_data(env_data_path, fire_data_path, use_cache=True):
+   """preps environmental and fire data for modeling
+   
+   for csv input the result (FWI features included) is cached as parquet
+   next to the csv and reused until either input file changes"""
+   cache_path = None
+   if use_cache and isinstance(env_data_path, (str, os.PathLike)):
+       cache_path = Path(env_data_path).with_suffix(FWI_CACHE_SUFFIX)
+       cache_key = _cache_key(env_data_path, fire_data_path)
+       cached = _read_cache(cache_path, cache_key)
+       if cached is not None:
+           return cached
+   
+   fire_locations = None
    if fire_data_path:
-       # merge in historical fire data if we have it
-       fire_df = pd.read_csv(fire_data_path)
+       # historical fire data is small - load it once up front (multithreaded
+       # pyarrow parser, it can't do chunksize so the env csv below stays on C)
+       fire_df = pd.read_csv(fire_data_path, engine='pyarrow')
        fire_df['timestamp'] = pd.to_datetime(fire_df['timestamp'])
        
-       # need unique id for each location-time combo
-       env_df['location_time'] = env_df['timestamp'].dt.strftime('%Y-%m-%d %H:00:00') + '_' + \
-                                env_df['latitude'].round(4).astype(str) + '_' + \
-                                env_df['longitude'].round(4).astype(str)
-       
-       fire_df['location_time'] = fire_df['timestamp'].dt.strftime('%Y-%m-%d %H:00:00') + '_' + \
-                                 fire_df['latitude'].round(4).astype(str) + '_' + \
-                                 fire_df['longitude'].round(4).astype(str)
-       
        # mark where fires happened
-       fire_locations = fire_df[['location_time']].drop_duplicates()
-       fire_locations['fire_occurred'] = 1
+       fire_locations = pd.unique(_location_time(fire_df))
+   
+   # load the env data - api callers pass an already built DataFrame, csvs get
+   # read in chunks so the key columns only ever cover CSV_CHUNK_SIZE rows
+   if isinstance(env_data_path, pd.DataFrame):
+       chunks = [env_data_path.copy()]
+   else:
+       chunks = pd.read_csv(env_data_path, chunksize=CSV_CHUNK_SIZE)
+   
+   parts = []
+   for env_df in chunks:
+       env_df['timestamp'] = pd.to_datetime(env_df['timestamp'])
        
-       # join it all together
-       env_df = env_df.merge(fire_locations[['location_time', 'fire_occurred']], 
-                            on='location_time', 
-                            how='left')
-       env_df['fire_occurred'] = env_df['fire_occurred'].fillna(0)
+       if fire_locations is not None:
+           # flag rows matching a historical fire - a hash lookup per row, no merge
+           # (pandas isin beats pyarrow.compute.is_in here once the int8 cast is counted)
+           env_df['fire_occurred'] = pd.Series(_location_time(env_df)).isin(fire_locations).to_numpy(np.int8)
+       parts.append(env_df)
+   env_df = parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
    
-   # add the FWI system features
+   # add the FWI system features - needs the whole series in timestamp order so
+   # this runs once on the combined frame rather than per chunk
    env_df = create_fwi_features(env_df)
    
-   return env_df
\ No newline at end of file
+   if cache_path is not None:
+       _write_cache(env_df, cache_path, cache_key)
+   
+   return env_df
@@ -1,46 +1,71 @@
 # prediction export utilities
 # handles json formatting for api responses
+import numpy as np
 import pandas as pd
-import json
-from datetime import datetime
+
+def group_by_day(days):
+   """sort once by day instead of a groupby
+   
+   returns a stable order grouping the datetime64[D] days (rows keep their
+   order within a day) and where each day starts in that order"""
+   order = np.argsort(days, kind='stable')
+   sorted_days = days[order]
+   new_day = np.ones(len(days), dtype=bool)
+   new_day[1:] = sorted_days[1:] != sorted_days[:-1]
+   return order, np.flatnonzero(new_day)
 
 def export_predictions_to_json_in_memory(predictions_df, probability_threshold=0.90):
    """formats predictions for api response - keeps everything in memory"""
    
    # only keep the risky ones
-   high_risk = predictions_df[predictions_df['fire_probability'] >= probability_threshold].copy()
+   high_risk = predictions_df[predictions_df['fire_probability'] >= probability_threshold]
 
    # ensure timestamps are datetime
-   high_risk['timestamp'] = pd.to_datetime(high_risk['timestamp'])
+   timestamps = pd.to_datetime(high_risk['timestamp'])
+   days = timestamps.to_numpy().astype('datetime64[D]')
 
-   # setup the json structure 
-   predictions_json = {
-       "predictions": {}
-   }
+   order, starts = group_by_day(days)
+   bounds = np.append(starts, len(days)).tolist()
+   # only the first row of each day gets turned into a 'YYYY-mm-dd' string
+   unique_dates = np.datetime_as_string(days[order[starts]], unit='D')
 
-   # group by date for better organization
-   for date, group in high_risk.groupby(high_risk['timestamp'].dt.date.astype(str)):
-       predictions_json["predictions"][date] = []
-
-       # format each prediction nicely
-       for _, row in group.iterrows():
-           prediction = {
-               "time": row['timestamp'].strftime('%H:%M:%S'),
-               # location details
-               "location": {
-                   "latitude": float(row['latitude']),
-                   "longitude": float(row['longitude'])
-               },
-               # all the risk indicators
-               "risk_factors": {
-                   "fire_probability": float(row['fire_probability']),
-                   "temperature": float(row.get('temperature', 0.0)),
-                   "humidity": float(row.get('humidity', 0.0)), 
-                   "wind_speed": float(row.get('wind_speed', 0.0)),
-                   "fwi": float(row.get('FWI', 0.0)),     # fire weather index
-                   "dsr": float(row.get('DSR', 0.0))      # daily severity rating
-               }
+   # pull each column out once as plain floats, optional env columns default to 0
+   n = len(order)
+   times = timestamps.dt.strftime('%H:%M:%S').to_numpy()[order].tolist()
+   columns = [
+       high_risk[col].to_numpy(dtype=float)[order].tolist() if col in high_risk.columns else [0.0] * n
+       for col in ('latitude', 'longitude', 'fire_probability',
+                   'temperature', 'humidity', 'wind_speed', 'FWI', 'DSR')
+   ]
+
+   # format each prediction nicely
+   rows = [
+       {
+           "time": time,
+           # location details
+           "location": {
+               "latitude": lat,
+               "longitude": lng
+           },
+           # all the risk indicators
+           "risk_factors": {
+               "fire_probability": prob,
+               "temperature": temp,
+               "humidity": hum,
+               "wind_speed": wind,
+               "fwi": fwi,     # fire weather index
+               "dsr": dsr      # daily severity rating
            }
-           predictions_json["predictions"][date].append(prediction)
+       }
+       for time, lat, lng, prob, temp, hum, wind, fwi, dsr in zip(times, *columns)
+   ]
+
+   # setup the json structure, grouped by date for better organization
+   predictions_json = {
+       "predictions": {
+           date: rows[bounds[i]:bounds[i + 1]]
+           for i, date in enumerate(unique_dates.tolist())
+       }
+   }
 
-   return predictions_json
\ No newline at end of file
+   return predictions_json
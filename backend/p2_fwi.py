@@ -1,162 +1,458 @@
 # fire weather indices calculation module
 # implements Canadian FWI System equations w/vectorization
 # ref: Van Wagner, C.E., 1987 Development & Structure of the Canadian FWI System
+import math
 import numpy as np
 
-def calculate_isi(ffmc, wind):
-   """initial spread index - how fast fire spreads"""
+# monthly day length factors for dmc (el) and dc (fl), indexed by month-1
+DMC_DAY_LENGTH = (6.5, 7.5, 9.0, 12.8, 13.9, 13.9, 12.4, 10.9, 9.4, 8.0, 7.0, 6.0)
+DC_DAY_LENGTH = (-1.6, -1.6, -1.6, 0.9, 3.8, 5.8, 6.4, 5.0, 2.4, 0.4, -1.6, -1.6)
+# same tables as arrays, built once - float64 for the *_vectorized functions,
+# float32 for the precomputed terms of fwi_recurrence
+_EL = np.array(DMC_DAY_LENGTH)
+_FL = np.array(DC_DAY_LENGTH)
+_EL32 = _EL.astype(np.float32)
+_FL32 = _FL.astype(np.float32)
+
+def _isi(ffmc, wind, scratch):
+   """isi into a fresh array, w/ one same-size scratch buffer"""
    # convert ffmc to moisture content
-   fm = 147.2 * (101.0 - ffmc) / (59.5 + ffmc) 
+   fm = np.subtract(101.0, ffmc, out=scratch)
+   fm *= 147.2
+   fm /= 59.5 + ffmc
    
    # calc spread factor then combine w/wind
-   sf = 19.115 * np.exp(-0.1386 * fm) * (1.0 + (fm**5.31) / 4.93e7)
-   return sf * (1.0 + 0.0201 * wind**2.496)
+   isi = np.multiply(fm, -0.1386, out=np.empty_like(fm))
+   np.exp(isi, out=isi)
+   isi *= 19.115
+   tmp = np.power(fm, 5.31, out=fm)
+   tmp /= 4.93e7
+   tmp += 1.0
+   isi *= tmp
+   tmp = np.power(wind, 2.496, out=tmp)
+   tmp *= 0.0201
+   tmp += 1.0
+   isi *= tmp
+   return isi
+
+def _bui(dmc, dc, scratch):
+   """bui into a fresh array, each ratio case only on its own rows"""
+   denom = np.multiply(dc, 0.4, out=scratch)
+   denom += dmc
+   low = dmc <= 0.4 * dc
+   high = ~low
+   bui = np.empty_like(denom)
+   bui[low] = 0.8 * dmc[low] * dc[low] / denom[low]
+   bui[high] = dmc[high] - (1.0 - 0.8 * dc[high] / denom[high]) * \
+               (0.92 + (0.0114 * dmc[high])**1.7)
+   return bui
+
+def _fwi(isi, bui):
+   """fwi into a fresh array, each bui / B case only on its own rows"""
+   low = bui <= 80.0
+   high = ~low
+   fD = np.empty_like(bui)
+   fD[low] = 0.626 * bui[low]**0.809 + 2.0
+   fD[high] = 1000.0 / (25.0 + 108.64 * np.exp(-0.023 * bui[high]))
+   fwi = np.multiply(isi, 0.1, out=np.empty_like(fD))  # B
+   fwi *= fD
+   big = fwi > 1.0
+   fwi[big] = np.exp(2.72 * (0.434 * np.log(fwi[big]))**0.647)
+   return fwi
+
+def _dsr(fwi, out):
+   """dsr written into out"""
+   dsr = np.power(fwi, 1.77, out=out)
+   dsr *= 0.0272
+   return dsr
+
+def _month_index(month):
+   """month numbers (1-12) -> table indices, w/ a single int conversion"""
+   idx = np.asarray(month).astype(np.intp)
+   idx -= 1
+   return idx
+
+def _pow8(x, out=None):
+   """x**8 as three squarings instead of a pow call"""
+   y = np.multiply(x, x, out=out)
+   y *= y
+   y *= y
+   return y
+
+def _as_arrays(*arrays):
+   """float64 arrays broadcast to one shape (inputs are only ever read)
+   
+   the public wrappers index the result w/ [()] so scalar inputs still give
+   back a scalar"""
+   return np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in arrays))
+
+def calculate_isi(ffmc, wind):
+   """initial spread index - how fast fire spreads"""
+   ffmc, wind = _as_arrays(ffmc, wind)
+   return _isi(ffmc, wind, np.empty_like(ffmc))[()]
 
 def calculate_bui(dmc, dc):
    """buildup index - available fuel"""
-   # handle different dmc/dc ratio cases
-   condition = dmc <= 0.4 * dc
-   result = np.where(condition,
-                    0.8 * dmc * dc / (dmc + 0.4 * dc),
-                    dmc - (1.0 - 0.8 * dc / (dmc + 0.4 * dc)) * (0.92 + (0.0114 * dmc)**1.7))
-   return result
+   dmc, dc = _as_arrays(dmc, dc)
+   return _bui(dmc, dc, np.empty_like(dmc))[()]
 
 def calculate_fwi(isi, bui):
    """final fire weather index"""
-   # diff equations based on bui threshold
-   condition = bui <= 80.0
-   fD = np.where(condition,
-                 0.626 * bui**0.809 + 2.0,
-                 1000.0 / (25.0 + 108.64 * np.exp(-0.023 * bui)))
-   
-   B = 0.1 * isi * fD
-   condition_B = B > 1.0
-   return np.where(condition_B,
-                  np.exp(2.72 * (0.434 * np.log(B))**0.647),
-                  B)
+   isi, bui = _as_arrays(isi, bui)
+   return _fwi(isi, bui)[()]
 
 def calculate_dsr(fwi):
    """daily severity rating - simplified version"""
-   return 0.0272 * (fwi**1.77)
-
-def calculate_ffmc_vectorized(temp, rh, wind, rain, prev_ffmc):
-   """fine fuel moisture code - fastest responding"""
-   # keep inputs in valid ranges
-   temp = np.clip(temp, -50, 50)  # temps beyond these get weird
-   rh = np.clip(rh, 0, 100)       # humidity 0-100%
-   wind = np.clip(wind, 0, 100)   # max reasonable wind
-   rain = np.clip(rain, 0, np.inf) # rain cant be negative
+   fwi = np.asarray(fwi, dtype=np.float64)
+   return _dsr(fwi, np.empty_like(fwi))[()]
 
-   ffmc = prev_ffmc.copy()
+def calculate_indices(ffmc, wind, dmc, dc):
+   """isi, bui, fwi & dsr in one go - same code as the 4 functions above
    
-   # handle rain effects first if any
-   rain_mask = rain > 0.5  # only count rain > 0.5mm
-   rf = np.where(rain_mask, rain - 0.5, 0)
-   
-   # get current moisture level
-   mo = np.where(prev_ffmc <= 150, prev_ffmc / 59.5, 
-                2.72 * (1.0 - np.exp(-0.679 * prev_ffmc/59.5)) + 
-                0.720 * np.exp(-0.179 * prev_ffmc/59.5) + 
-                0.174 * np.exp(-0.234 * prev_ffmc/59.5))
+   shares one scratch buffer across all four stages (and reuses it as the
+   dsr output) instead of a fresh array per subexpression, and the two-branch
+   formulas (bui, fD, fwi) only get evaluated on the rows they apply to"""
+   ffmc, wind, dmc, dc = _as_arrays(ffmc, wind, dmc, dc)
+   scratch = np.empty_like(ffmc)
+   isi = _isi(ffmc, wind, scratch)
+   bui = _bui(dmc, dc, scratch)
+   fwi = _fwi(isi, bui)
+   return isi, bui, fwi, _dsr(fwi, scratch)
+
+def clip_weather(temp, rh, wind, rain):
+   """keeps weather inputs in valid ranges, in place
    
-   # adjust for rainfall
-   mr = mo + 42.5 * rf * np.exp(-100.0 / (251.0 - mo)) * (1.0 - np.exp(-6.93 / rf))
-   mr = np.where(mr > 250, 250, mr)
+   the ffmc/dmc/dc functions below expect inputs already run through this -
+   done once per column by the caller rather than on every call"""
+   np.clip(temp, -50, 50, out=temp)    # temps beyond these get weird
+   np.clip(rh, 0, 100, out=rh)         # humidity 0-100%
+   np.clip(wind, 0, 100, out=wind)     # max reasonable wind
+   np.clip(rain, 0, np.inf, out=rain)  # rain cant be negative
+
+def calculate_ffmc_vectorized(temp, rh, wind, rain, prev_ffmc):
+   """fine fuel moisture code - fastest responding (inputs from clip_weather)
    
-   # update moisture where it rained
-   ffmc = np.where(rain_mask, 59.5 * (250.0 - mr) / (147.27 + mr), ffmc)
+   each case (rain, drying above ed, wetting below ew) is only evaluated on
+   the rows it applies to, the full-length terms reuse a couple of buffers"""
+   temp, rh, wind, rain, prev = _as_arrays(temp, rh, wind, rain, prev_ffmc)
+   shape = prev.shape
+   temp, rh, wind, rain, prev = (a.ravel() for a in (temp, rh, wind, rain, prev))
+   ffmc = prev.copy()
    
-   # temp & humidity effects
-   ed = 0.942 * (rh ** 0.679) + (11.0 * np.exp((rh - 100.0) / 10.0)) + 0.18 * \
-        (21.1 - temp) * (1.0 - np.exp(-0.115 * rh))
+   # handle rain effects first if any - only count rain > 0.5mm
+   wet = np.flatnonzero(rain > 0.5)
+   if len(wet):
+       rf = rain[wet] - 0.5
+       
+       # get current moisture level - the exp branch only runs on the
+       # (normally empty) > 150 part
+       p = prev[wet]
+       mo = p / 59.5
+       high = p > 150
+       if high.any():
+           x = p[high]
+           mo[high] = 2.72 * (1.0 - np.exp(-0.679 * x/59.5)) + \
+                      0.720 * np.exp(-0.179 * x/59.5) + \
+                      0.174 * np.exp(-0.234 * x/59.5)
+       
+       # adjust for rainfall
+       mr = mo + 42.5 * rf * np.exp(-100.0 / (251.0 - mo)) * (1.0 - np.exp(-6.93 / rf))
+       np.minimum(mr, 250, out=mr)
+       
+       # update moisture where it rained
+       ffmc[wet] = 59.5 * (250.0 - mr) / (147.27 + mr)
    
-   mask_above_ed = ffmc > ed
+   # temp & humidity terms shared by ed + ew
+   humid_term = np.subtract(rh, 100.0)
+   humid_term /= 10.0
+   np.exp(humid_term, out=humid_term)
+   temp_term = np.multiply(rh, -0.115)
+   np.exp(temp_term, out=temp_term)
+   np.subtract(1.0, temp_term, out=temp_term)
+   temp_term *= 0.18 * (21.1 - temp)  # 0.18 * (21.1-temp) * (1-exp(-0.115*rh))
    
    # drying above equilibrium
-   ko = 0.424 * (1.0 - (rh/100.0)**1.7) + 0.0694 * np.sqrt(wind) * \
-        (1.0 - (rh/100.0)**8)
-   kd = ko * 0.581 * np.exp(0.0365 * temp)
-   m_above = ed + (ffmc - ed) * np.exp(-kd)
-   
-   # wetting below equilibrium  
-   ew = 0.618 * (rh**0.753) + (10.0 * np.exp((rh-100.0)/10.0)) + \
-        0.18 * (21.1-temp) * (1.0-np.exp(-0.115*rh))
+   ed = np.power(rh, 0.679)
+   ed *= 0.942
+   ed += 11.0 * humid_term
+   ed += temp_term
+   above = ffmc > ed
    
-   mask_below_ew = ffmc < ew
-   k1 = 0.424 * (1.0-(100.0-rh)/100.0**1.7) + \
-        0.0694 * np.sqrt(wind) * (1.0-(100.0-rh)/100.0**8)
-   kw = k1 * 0.581 * np.exp(0.0365*temp)
-   m_below = ew - (ew-ffmc) * np.exp(-kw)
+   m = ffmc.copy()
+   dry = np.flatnonzero(above)
+   if len(dry):
+       h, w = rh[dry], wind[dry]
+       q = h / 100.0
+       ko = 0.424 * (1.0 - q**1.7) + 0.0694 * np.sqrt(w) * (1.0 - _pow8(q))
+       kd = ko * 0.581 * np.exp(0.0365 * temp[dry])
+       m[dry] = ed[dry] + (ffmc[dry] - ed[dry]) * np.exp(-kd)
    
-   # combine all cases
-   m = np.where(mask_above_ed, m_above,
-                np.where(mask_below_ew, m_below, ffmc))
+   # wetting below equilibrium, only checked where not already drying
+   rest = np.flatnonzero(~above)
+   h = rh[rest]
+   ew = 0.618 * (h**0.753) + (10.0 * humid_term[rest]) + temp_term[rest]
+   below = ffmc[rest] < ew
+   damp = rest[below]
+   if len(damp):
+       h, w, ew = rh[damp], wind[damp], ew[below]
+       q = (100.0 - h) / 100.0
+       k1 = 0.424 * (1.0 - q**1.7) + 0.0694 * np.sqrt(w) * (1.0 - _pow8(q))
+       kw = k1 * 0.581 * np.exp(0.0365*temp[damp])
+       m[damp] = ew - (ew-ffmc[damp]) * np.exp(-kw)
    
    # convert back to code value
-   return np.clip(59.5 * (250.0-m)/(147.2+m), 0, 101)
+   np.add(147.2, m, out=ed)
+   np.subtract(250.0, m, out=m)
+   m *= 59.5
+   m /= ed
+   np.clip(m, 0, 101, out=m)
+   return m.reshape(shape)[()]
 
 def calculate_dmc_vectorized(temp, rh, rain, prev_dmc, month):
-   """duff moisture code - medium speed response"""
-   # input constraints  
-   temp = np.clip(temp, -50, 50)
-   rh = np.clip(rh, 0, 100)
-   rain = np.clip(rain, 0, np.inf)
-   
-   dmc = prev_dmc.copy()
-   
-   # rain effect calcs
-   rain_mask = rain > 1.5
-   re = 0.92 * rain - 1.27
-   mo = 20.0 + np.exp(5.6348 - prev_dmc/43.43)
+   """duff moisture code - medium speed response (inputs from clip_weather)"""
+   temp, rh, rain, prev, month = _as_arrays(temp, rh, rain, prev_dmc, month)
+   shape = prev.shape
+   temp, rh, rain, prev, month = (a.ravel() for a in (temp, rh, rain, prev, month))
+   dmc = prev.copy()
    
-   # moisture effect varies w/dmc level
-   b = np.where(prev_dmc <= 33,
-                100.0 / (0.5 + 0.3 * prev_dmc),
-                np.where(prev_dmc <= 65,
-                        14.0 - 1.3 * np.log(prev_dmc),
-                        6.2 * np.log(prev_dmc) - 17.2))
-   
-   mr = mo + 1000.0 * re / (48.77 + b * re)
-   pr = 244.72 - 43.43 * np.log(mr - 20.0)
-   pr = np.clip(pr, 0, np.inf)
-   
-   # update where it rained
-   dmc = np.where(rain_mask, pr, dmc)
+   # rain effect calcs - the exp/logs only run on rows w/ enough rain to count
+   wet = np.flatnonzero(rain > 1.5)
+   if len(wet):
+       re = 0.92 * rain[wet] - 1.27
+       p = prev[wet]
+       mo = 20.0 + np.exp(5.6348 - p/43.43)
+       
+       # moisture effect varies w/dmc level - bucket each row once (<= 33,
+       # <= 65, rest + nans) and run each formula on its own bucket only
+       bucket = np.digitize(p, (33.0, 65.0), right=True)
+       b = np.empty_like(p)
+       low = bucket == 0
+       b[low] = 100.0 / (0.5 + 0.3 * p[low])
+       mid = bucket == 1
+       b[mid] = 14.0 - 1.3 * np.log(p[mid])
+       high = bucket == 2
+       b[high] = 6.2 * np.log(p[high]) - 17.2
+       
+       mr = mo + 1000.0 * re / (48.77 + b * re)
+       pr = 244.72 - 43.43 * np.log(mr - 20.0)
+       
+       # update where it rained
+       dmc[wet] = np.clip(pr, 0, np.inf)
    
    # seasonal temp & humidity effects
-   el = np.array([6.5, 7.5, 9.0, 12.8, 13.9, 13.9, 12.4, 10.9, 9.4, 8.0, 7.0, 6.0])
-   el_month = el[month.astype(int) - 1]
+   el_month = _EL.take(_month_index(month))
    
    t = np.maximum(temp, -1.1)
    d1 = 1.894 * (t + 1.1) * (100.0 - rh) * el_month * 0.0001
    
-   return np.maximum(0, dmc + d1)
+   dmc += d1
+   np.maximum(dmc, 0, out=dmc)
+   return dmc.reshape(shape)[()]
 
 def calculate_dc_vectorized(temp, rain, prev_dc, month):
-   """drought code - slowest response, deep drying"""
-   # constrain inputs
-   temp = np.clip(temp, -50, 50)
-   rain = np.clip(rain, 0, np.inf)
+   """drought code - slowest response, deep drying (inputs from clip_weather)"""
+   temp, rain, prev, month = _as_arrays(temp, rain, prev_dc, month)
+   shape = prev.shape
+   temp, rain, prev, month = (a.ravel() for a in (temp, rain, prev, month))
+   dc = prev.copy()
+   
+   # heavy rain needed to affect dc - exp/log only on those rows
+   wet = np.flatnonzero(rain > 2.8)
+   if len(wet):
+       rd = 0.83 * rain[wet] - 1.27
+       Qo = 800.0 * np.exp(-prev[wet]/400.0)
+       Qr = Qo + 3.937 * rd
+       dr = 400.0 * np.log(800.0/Qr)
+       
+       # update after rain
+       dc[wet] = np.clip(dr, 0, np.inf)
+   
+   # seasonal temp effect
+   fl_month = _FL.take(_month_index(month))
+   
+   # only rows above -2.8 get the drying term, the rest keep dc as is
+   warm = np.flatnonzero(temp > -2.8)
+   v = 0.36 * (temp[warm] + 2.8) + fl_month[warm]
+   v = np.clip(v, 0, np.inf)
+   dc[warm] += 0.5 * v
+   
+   return dc.reshape(shape)[()]
+
+def _ffmc_terms(temp, rh, wind, rain):
+   """everything in the ffmc update that doesnt depend on yesterdays ffmc"""
+   rain_mask = rain > 0.5
+   rf = rain[rain_mask] - 0.5
+   rain_gain = np.zeros_like(rain)
+   rain_gain[rain_mask] = 42.5 * rf * (1.0 - np.exp(-6.93 / rf))
    
-   dc = prev_dc.copy()
+   # equilibrium moisture for drying (ed) and wetting (ew)
+   temp_term = 0.18 * (21.1 - temp) * (1.0 - np.exp(-0.115 * rh))
+   humid_term = np.exp((rh - 100.0) / 10.0)
+   ed = 0.942 * (rh ** 0.679) + 11.0 * humid_term + temp_term
+   ew = 0.618 * (rh ** 0.753) + 10.0 * humid_term + temp_term
    
-   # heavy rain needed to affect dc
+   # per step decay factors exp(-kd) / exp(-kw)
+   temp_rate = 0.581 * np.exp(0.0365 * temp)
+   q = rh / 100.0
+   ko = 0.424 * (1.0 - q**1.7) + 0.0694 * np.sqrt(wind) * (1.0 - _pow8(q))
+   q = (100.0 - rh) / 100.0
+   k1 = 0.424 * (1.0 - q**1.7) + 0.0694 * np.sqrt(wind) * (1.0 - _pow8(q))
+   dry = np.exp(-ko * temp_rate)
+   wet = np.exp(-k1 * temp_rate)
+   return rain_mask, rain_gain, ed, ew, dry, wet
+
+def _dmc_terms(temp, rh, rain, month_idx):
+   """rain + seasonal drying terms of the dmc update"""
+   rain_mask = rain > 1.5
+   re = 0.92 * rain - 1.27
+   el_month = (_EL32 if temp.dtype == np.float32 else _EL).take(month_idx)
+   t = np.maximum(temp, -1.1)
+   d1 = 1.894 * (t + 1.1) * (100.0 - rh) * el_month * 0.0001
+   return rain_mask, re, d1
+
+def _dc_terms(temp, rain, month_idx):
+   """rain + seasonal drying terms of the dc update"""
    rain_mask = rain > 2.8
-   rd = 0.83 * rain - 1.27
-   Qo = 800.0 * np.exp(-prev_dc/400.0)
-   Qr = Qo + 3.937 * rd
-   dr = 400.0 * np.log(800.0/Qr)
-   dr = np.clip(dr, 0, np.inf)
+   rd = 3.937 * (0.83 * rain - 1.27)
+   fl_month = (_FL32 if temp.dtype == np.float32 else _FL).take(month_idx)
+   v = np.clip(0.36 * (temp + 2.8) + fl_month, 0, np.inf)
+   dry = np.multiply(v, 0.5, out=v)
+   dry[~(temp > -2.8)] = 0.0  # nan temps included, same as the > test
+   return rain_mask, rd, dry
+
+def _ffmc_step(ffmc, f_rain, rain_gain, ed, ew, dry, wet):
+   """next ffmc from yesterdays + that days _ffmc_terms, one python float at a time
+   
+   scalar reference for the update - the tests pin calculate_ffmc_vectorized
+   and the fwi_recurrence loop to it"""
+   m = ffmc
+   if f_rain:
+       if ffmc > 150:
+           x = ffmc / 59.5
+           mo = 2.72 * (1.0 - math.exp(-0.679 * x)) + \
+                0.720 * math.exp(-0.179 * x) + 0.174 * math.exp(-0.234 * x)
+       else:
+           mo = ffmc / 59.5
+       mr = mo + rain_gain * math.exp(-100.0 / (251.0 - mo))
+       if mr > 250:
+           mr = 250
+       m = 59.5 * (250.0 - mr) / (147.27 + mr)
+   if m > ed:
+       m = ed + (m - ed) * dry
+   elif m < ew:
+       m = ew - (ew - m) * wet
+   ffmc = 59.5 * (250.0-m)/(147.2+m)
+   if ffmc < 0:
+       ffmc = 0.0
+   elif ffmc > 101:
+       ffmc = 101.0
+   return ffmc
+
+def _dmc_step(dmc, d_rain, re, d_dry):
+   """next dmc from yesterdays + that days _dmc_terms (scalar reference,
+   same as _ffmc_step)"""
+   if d_rain:
+       mo = 20.0 + math.exp(5.6348 - dmc/43.43)
+       if dmc <= 33:
+           b = 100.0 / (0.5 + 0.3 * dmc)
+       elif dmc <= 65:
+           b = 14.0 - 1.3 * math.log(dmc)
+       else:
+           b = 6.2 * math.log(dmc) - 17.2
+       dmc = 244.72 - 43.43 * math.log(mo + 1000.0 * re / (48.77 + b * re) - 20.0)
+       if dmc < 0:
+           dmc = 0.0
+   dmc = dmc + d_dry
+   if dmc < 0:
+       dmc = 0.0
+   return dmc
+
+def _dc_step(dc, c_rain, rd, c_dry):
+   """next dc from yesterdays + that days _dc_terms (scalar reference,
+   same as _ffmc_step)"""
+   if c_rain:
+       dc = 400.0 * math.log(800.0 / (800.0 * math.exp(-dc/400.0) + rd))
+       if dc < 0:
+           dc = 0.0
+   return dc + c_dry
+
+def fwi_recurrence(temp, rh, wind, rain, months, ffmc_out, dmc_out, dc_out):
+   """ffmc/dmc/dc over a whole timeseries in one sequential pass
    
-   # update after rain
-   dc = np.where(rain_mask, dr, dc)
+   same math as the *_vectorized functions and the _*_step references above
+   (inlined here, a call per row costs 10-20%). all the weather only terms
+   (rain masks, ed/ew, decay rates, monthly tables) get computed on the
+   whole column up front, the python loop only does the parts that need the
+   previous day. inputs are expected to be clipped already (clip_weather).
+   row 0 of the out arrays holds the starting values, rows 1.. get filled
+   in here (clips are written as `if x < lo` so nans pass thru)"""
+   temp = temp[1:]
+   rh = rh[1:]
+   wind = wind[1:]
+   rain = rain[1:]
+   month_idx = _month_index(months[1:])  # shared by the dmc + dc tables
+   with np.errstate(divide='ignore', invalid='ignore'):
+       ffmc_terms = _ffmc_terms(temp, rh, wind, rain)
+       dmc_terms = _dmc_terms(temp, rh, rain, month_idx)
+       dc_terms = _dc_terms(temp, rain, month_idx)
    
-   # seasonal temp effect
-   fl = np.array([-1.6, -1.6, -1.6, 0.9, 3.8, 5.8, 6.4, 5.0, 2.4, 0.4, -1.6, -1.6])
-   fl_month = fl[month.astype(int) - 1]
+   exp = math.exp
+   log = math.log
+   ffmc = float(ffmc_out[0])
+   dmc = float(dmc_out[0])
+   dc = float(dc_out[0])
+   ffmc_vals = []
+   dmc_vals = []
+   dc_vals = []
    
-   temp_mask = temp > -2.8
-   v = 0.36 * (temp + 2.8) + fl_month  
-   v = np.clip(v, 0, np.inf)
+   rows = zip(*(a.tolist() for a in ffmc_terms + dmc_terms + dc_terms))
+   for (f_rain, rain_gain, ed, ew, dry, wet,
+        d_rain, re, d_dry, c_rain, rd, c_dry) in rows:
+       # fine fuel moisture
+       m = ffmc
+       if f_rain:
+           mo = ffmc / 59.5  # ffmc is capped at 101 so always the <= 150 case
+           mr = mo + rain_gain * exp(-100.0 / (251.0 - mo))
+           if mr > 250:
+               mr = 250
+           m = 59.5 * (250.0 - mr) / (147.27 + mr)
+       if m > ed:
+           m = ed + (m - ed) * dry
+       elif m < ew:
+           m = ew - (ew - m) * wet
+       ffmc = 59.5 * (250.0-m)/(147.2+m)
+       if ffmc < 0:
+           ffmc = 0.0
+       elif ffmc > 101:
+           ffmc = 101.0
+
+       # duff moisture
+       if d_rain:
+           mo = 20.0 + exp(5.6348 - dmc/43.43)
+           if dmc <= 33:
+               b = 100.0 / (0.5 + 0.3 * dmc)
+           elif dmc <= 65:
+               b = 14.0 - 1.3 * log(dmc)
+           else:
+               b = 6.2 * log(dmc) - 17.2
+           dmc = 244.72 - 43.43 * log(mo + 1000.0 * re / (48.77 + b * re) - 20.0)
+           if dmc < 0:
+               dmc = 0.0
+       dmc = dmc + d_dry
+       if dmc < 0:
+           dmc = 0.0
+
+       # drought code
+       if c_rain:
+           dc = 400.0 * log(800.0 / (800.0 * exp(-dc/400.0) + rd))
+           if dc < 0:
+               dc = 0.0
+       dc = dc + c_dry
+       
+       ffmc_vals.append(ffmc)
+       dmc_vals.append(dmc)
+       dc_vals.append(dc)
    
-   return np.where(temp_mask, dc + 0.5 * v, dc)
\ No newline at end of file
+   ffmc_out[1:] = ffmc_vals
+   dmc_out[1:] = dmc_vals
+   dc_out[1:] = dc_vals
@@ -1,49 +1,23 @@
 # main script for training & running wildfire prediction model
 # threshold set to 0.90 for high confidence predictions only
+import numpy as np
 import pandas as pd
-import json
-from datetime import datetime
-from p2_data_prep import prepare_data
+import orjson
+from p2_data_prep import prepare_data, CSV_CHUNK_SIZE
 from p2_model import WildfirePredictor
+from p2_export import export_predictions_to_json_in_memory, group_by_day
 import warnings
 warnings.filterwarnings('ignore')  # suppress sklearn warnings
 
 def export_predictions_to_json(predictions_df, output_file='predictions.json', probability_threshold=0.90):
    """formats predictions as json & saves to file"""
-   # only keep high risk predictions
-   high_risk = predictions_df[predictions_df['fire_probability'] >= probability_threshold].copy()
-   high_risk['timestamp'] = pd.to_datetime(high_risk['timestamp'])
-   
-   # setup json structure
-   predictions_json = {
-       "predictions": {}
-   }
-   
-   # group by date for readability
-   for date, group in high_risk.groupby(high_risk['timestamp'].dt.date.astype(str)):
-       predictions_json["predictions"][date] = []
-       
-       for _, row in group.iterrows():
-           prediction = {
-               "time": row['timestamp'].strftime('%H:%M:%S'),
-               "location": {
-                   "latitude": float(row['latitude']),
-                   "longitude": float(row['longitude'])
-               },
-               "risk_factors": {
-                   "fire_probability": float(row['fire_probability']),  # main risk score
-                   "temperature": float(row['temperature']),           # supporting env data 
-                   "humidity": float(row['humidity']),
-                   "wind_speed": float(row['wind_speed']),
-                   "fwi": float(row['FWI']),      # fire weather index
-                   "dsr": float(row['DSR'])       # daily severity
-               }
-           }
-           predictions_json["predictions"][date].append(prediction)
+   # same structure the api builds (grouped by date, one dict per row), done
+   # column-wise instead of row by row
+   predictions_json = export_predictions_to_json_in_memory(predictions_df, probability_threshold)
    
    # save the results
-   with open(output_file, 'w') as f:
-       json.dump(predictions_json, f, indent=2)
+   with open(output_file, 'wb') as f:
+       f.write(orjson.dumps(predictions_json, option=orjson.OPT_INDENT_2))
    
    print(f"Predictions exported to {output_file}")
    return predictions_json
@@ -67,8 +41,10 @@ def train_model():
    
    return predictor
 
-def make_predictions(predictor=None):
-   """generate predictions w/ trained model"""
+def make_predictions(predictor=None, probability_threshold=None, batch_size=CSV_CHUNK_SIZE):
+   """generate predictions w/ trained model
+   
+   w/ probability_threshold set only the rows at or above it are kept"""
    # load model if not provided
    if predictor is None:
        predictor = WildfirePredictor()
@@ -82,35 +58,66 @@ def make_predictions(predictor=None):
    future_df = prepare_data(future_data_path, None)
    
    print("Making predictions...")
-   predictions = predictor.predict(future_df, probability_threshold=0.90)
+   # the FWI features need the whole timeseries, but scoring doesnt - run the
+   # model batch_size rows at a time so the scaled features stay O(batch), and
+   # drop the low risk rows of each batch right away if we only want the rest
+   threshold = 0.90 if probability_threshold is None else probability_threshold
+   if len(future_df) <= batch_size:
+       batches = [future_df]
+   else:
+       batches = (future_df.iloc[start:start + batch_size] for start in range(0, len(future_df), batch_size))
+   parts = []
+   for batch in batches:
+       batch = predictor.predict(batch, probability_threshold=threshold)
+       if probability_threshold is not None:
+           batch = batch[batch['fire_probability'] >= probability_threshold]
+       parts.append(batch)
+   predictions = parts[0] if len(parts) == 1 else pd.concat(parts)
    
    return predictions
 
 def print_predictions(predictions_df, probability_threshold=0.90):
    """display predictions in readable format"""
-   predictions_df['date'] = pd.to_datetime(predictions_df['timestamp']).dt.date
-   
    # only show high risk areas
    high_risk = predictions_df[predictions_df['fire_probability'] >= probability_threshold].sort_values('timestamp')
    
+   # callers get a date column back (it ends up in the predictions csv) - a
+   # plain datetime64[D] cast instead of one python date object per row
+   predictions_df['date'] = predictions_df['timestamp'].to_numpy().astype('datetime64[D]')
+   
    if len(high_risk) > 0:
        print(f"\nPredicted Wildfire Risks (Fire Probability >= {probability_threshold*100}%):")
        print("="*70)
        
-       # group by date for organization
-       for date, group in high_risk.groupby('date'):
-           print(f"\nDate: {date}")
-           print("-"*70)
-           
-           for _, row in group.iterrows():
-               print(f"Time: {row['timestamp'].strftime('%H:%M:%S')}")
-               print(f"Location: ({row['latitude']:.4f}, {row['longitude']:.4f})")
-               print(f"Fire Probability: {row['fire_probability']:.1%}")
-               print(f"Temperature: {row['temperature']}°C")
-               print(f"Humidity: {row['humidity']}%")
-               print(f"Wind Speed: {row['wind_speed']} km/h")
-               print(f"FWI: {row['FWI']:.2f}")
-               print("-"*50)
+       # rows are in timestamp order, so each date is one contiguous run and
+       # group_by_day's order is the identity - only the run starts are needed
+       days = high_risk['timestamp'].to_numpy().astype('datetime64[D]')
+       _, starts = group_by_day(days)
+       bounds = np.append(starts, len(days)).tolist()
+       dates = np.datetime_as_string(days[starts], unit='D').tolist()
+       
+       # pull the columns out once and format every row into one string
+       times = high_risk['timestamp'].dt.strftime('%H:%M:%S').tolist()
+       columns = [high_risk[col].tolist() for col in
+                  ('latitude', 'longitude', 'fire_probability',
+                   'temperature', 'humidity', 'wind_speed', 'FWI')]
+       rows = [
+           f"Time: {time}\n"
+           f"Location: ({lat:.4f}, {lng:.4f})\n"
+           f"Fire Probability: {prob:.1%}\n"
+           f"Temperature: {temp}°C\n"
+           f"Humidity: {hum}%\n"
+           f"Wind Speed: {wind} km/h\n"
+           f"FWI: {fwi:.2f}\n" + "-"*50
+           for time, lat, lng, prob, temp, hum, wind, fwi in zip(times, *columns)
+       ]
+       
+       lines = []
+       for i, date in enumerate(dates):
+           lines.append(f"\nDate: {date}")
+           lines.append("-"*70)
+           lines.extend(rows[bounds[i]:bounds[i + 1]])
+       print("\n".join(lines))
    else:
        print("\nNo wildfire risks predicted above the threshold.")
 
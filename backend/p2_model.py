@@ -1,18 +1,23 @@
 # ml model for wildfire prediction
 # uses xgboost w/ environmental features & FWI components
+# (xgboost + sklearn take ~2s to import, so they only get imported by the
+# methods that need them - importing this module stays cheap)
 import pandas as pd
 import numpy as np
-from xgboost import XGBClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import classification_report
 import joblib
 import os
 from pathlib import Path
 
 class WildfirePredictor:
-   def __init__(self):
+   def __init__(self, device='cpu'):
+       # xgboost device for training - gpu is opt in ('cuda'), since a cuda
+       # enabled wheel (the standard pip one) says nothing about a gpu existing
+       self.device = device
        self.model = None
        self.scaler = None
+       # scaler mean/scale as plain arrays, see _cache_scaler
+       self._mean = None
+       self._scale = None
        # features we care about - env conditions + fire indices
        self.feature_cols = [
            'temperature', 'humidity', 'wind_speed', 'precipitation',
@@ -22,6 +27,9 @@ class WildfirePredictor:
        
    def train(self, env_df, probability_threshold=0.90):
        """train model on historical env data w/ FWI features"""
+       from xgboost import XGBClassifier
+       from sklearn.preprocessing import StandardScaler
+       
        # keep time order for train/test split
        env_df = env_df.sort_values('timestamp')
        
@@ -32,19 +40,22 @@ class WildfirePredictor:
        print(f"\nTraining on data before: {split_date}")
        print(f"Testing on data from: {split_date}")
        
-       # split the data
-       train_df = env_df[env_df['timestamp'] < split_date]
-       test_df = env_df[env_df['timestamp'] >= split_date]
-       
-       X_train = train_df[self.feature_cols]
-       y_train = train_df['fire_occurred']
-       X_test = test_df[self.feature_cols]
-       y_test = test_df['fire_occurred']
-       
-       # scale features for better training
-       self.scaler = StandardScaler()
-       X_train_scaled = self.scaler.fit_transform(X_train)
-       X_test_scaled = self.scaler.transform(X_test)
+       # split the data - features pulled out as one array, the train/test
+       # parts are just masked rows of it
+       train_mask = (env_df['timestamp'] < split_date).to_numpy()
+       test_mask = (env_df['timestamp'] >= split_date).to_numpy()
+       X = env_df[self.feature_cols].to_numpy(dtype=np.float64, copy=True)  # scaled in place below
+       y = env_df['fire_occurred'].to_numpy()
+       y_train = y[train_mask]
+       y_test = y[test_mask]
+       
+       # scale features for better training - the scaler only supplies the
+       # mean/std, the transform itself is _scale_array (scales X in place)
+       self.scaler = StandardScaler().fit(X[train_mask])
+       self._cache_scaler()
+       X_scaled = self._scale_array(X)
+       X_train_scaled = X_scaled[train_mask]
+       X_test_scaled = X_scaled[test_mask]
        
        # handle class imbalance
        pos_weight = len(y_train[y_train==0])/len(y_train[y_train==1])
@@ -58,7 +69,10 @@ class WildfirePredictor:
            min_child_weight=6,
            subsample=0.6,                  # reduce variance
            colsample_bytree=0.6,
-           random_state=42                 # reproducible
+           random_state=42,                # reproducible
+           tree_method='hist',             # binned splits, fast on big data
+           device=self.device,
+           n_jobs=os.cpu_count()           # all cores for building trees
        )
        
        self.model.fit(X_train_scaled, y_train)
@@ -68,9 +82,35 @@ class WildfirePredictor:
        
        return self
    
+   def _cache_scaler(self):
+       """pull mean/scale out of the fitted scaler for _scale_features"""
+       self._mean = self.scaler.mean_.astype(np.float64)
+       self._scale = self.scaler.scale_.astype(np.float64)
+   
+   def _scale_features(self, df):
+       """same as scaler.transform(df[feature_cols]) w/o sklearn's validation
+       & extra copies"""
+       # copy=True - w/ all features in one float64 block (eg a parquet
+       # cache hit) to_numpy hands back a read-only view of the frame
+       return self._scale_array(df[self.feature_cols].to_numpy(dtype=np.float64, copy=True))
+   
+   def _scale_array(self, X):
+       """scale a float64 feature array the caller owns (it gets overwritten,
+       so never pass a view of a frame) - one subtract + divide,
+       written straight out as the float32 xgboost converts to anyway"""
+       X -= self._mean
+       return np.divide(X, self._scale, out=np.empty(X.shape, dtype=np.float32))
+   
+   def _predict_proba(self, X_scaled):
+       """positive class probabilities straight off the booster - no DMatrix,
+       no (n, 2) predict_proba matrix to slice"""
+       return self.model.get_booster().inplace_predict(X_scaled)
+   
    def _evaluate_model(self, X_test_scaled, y_test, probability_threshold):
        """check model performance metrics"""
-       y_pred_proba = self.model.predict_proba(X_test_scaled)[:, 1]
+       from sklearn.metrics import classification_report
+       
+       y_pred_proba = self._predict_proba(X_test_scaled)
        y_pred_high_conf = (y_pred_proba >= probability_threshold).astype(int)
        
        print(f"\nModel Performance (Threshold: {probability_threshold*100}%):")
@@ -102,11 +142,10 @@ class WildfirePredictor:
        if self.model is None or self.scaler is None:
            raise ValueError("Model not trained. Call train() first or load a saved model.")
            
-       X_future = future_df[self.feature_cols]
-       X_future_scaled = self.scaler.transform(X_future)
+       X_future_scaled = self._scale_features(future_df)
        
        # get probabilities and threshold
-       probabilities = self.model.predict_proba(X_future_scaled)[:, 1]
+       probabilities = self._predict_proba(X_future_scaled)
        predictions = (probabilities >= probability_threshold).astype(int)
        
        # add to results df
@@ -123,11 +162,12 @@ class WildfirePredictor:
        # make sure we have somewhere to save
        Path(model_dir).mkdir(parents=True, exist_ok=True)
        
-       # save both components
-       model_path = os.path.join(model_dir, 'wildfire_model.joblib')
+       # save both components - the model in xgboost's own ubjson format
+       # (just the trees + params, no pickled python state)
+       model_path = os.path.join(model_dir, 'wildfire_model.ubj')
        scaler_path = os.path.join(model_dir, 'scaler.joblib')
        
-       joblib.dump(self.model, model_path)
+       self.model.save_model(model_path)
        joblib.dump(self.scaler, scaler_path)
        
        print(f"Model saved to {model_path}")
@@ -135,13 +175,27 @@ class WildfirePredictor:
    
    def load_model(self, model_dir='models'):
        """load previously trained model"""
-       model_path = os.path.join(model_dir, 'wildfire_model.joblib')
+       model_path = os.path.join(model_dir, 'wildfire_model.ubj')
        scaler_path = os.path.join(model_dir, 'scaler.joblib')
+       # models saved before the switch to ubjson are pickles
+       legacy_path = os.path.join(model_dir, 'wildfire_model.joblib')
        
+       if not os.path.exists(model_path) and os.path.exists(legacy_path):
+           model_path = legacy_path
        if not os.path.exists(model_path) or not os.path.exists(scaler_path):
            raise FileNotFoundError("Model or scaler file not found. Train a model first.")
            
-       self.model = joblib.load(model_path)
+       if model_path == legacy_path:
+           self.model = joblib.load(model_path)
+       else:
+           from xgboost import XGBClassifier
+           self.model = XGBClassifier()
+           self.model.load_model(model_path)
        self.scaler = joblib.load(scaler_path)
+       self._cache_scaler()
+       
+       # score on every core - inputs are numpy arrays on the host, so
+       # prediction stays on the cpu even for gpu trained models
+       self.model.get_booster().set_param({'device': 'cpu', 'nthread': os.cpu_count()})
        
        print("Model and scaler loaded successfully")
\ No newline at end of file
@@ -0,0 +1,85 @@
+# api.py streaming + request validation
+# run from backend/: python -m unittest discover tests
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import orjson
+
+import api
+
+PREDICTIONS = [
+   ('2025-01-01', [{'time': '01:00:00', 'risk_factors': {'fire_probability': 0.95}}]),
+   ('2025-01-02', [{'time': '02:00:00', 'risk_factors': {'fire_probability': 0.97}}]),
+]
+
+class StreamPredictionsTest(unittest.TestCase):
+   def setUp(self):
+       self.tmp = tempfile.TemporaryDirectory()
+       self.output_file = Path(self.tmp.name) / 'predictions.json'
+
+   def tearDown(self):
+       self.tmp.cleanup()
+
+   def assertPublished(self):
+       # complete json, the umask derived mode and no temp files left over
+       self.assertEqual(os.listdir(self.tmp.name), ['predictions.json'])
+       self.assertEqual(stat.S_IMODE(self.output_file.stat().st_mode), api._OUTPUT_FILE_MODE)
+       body = orjson.loads(self.output_file.read_bytes())
+       self.assertEqual(list(body['predictions']), ['2025-01-01', '2025-01-02'])
+       return body
+
+   def test_streamed_body_matches_published_file(self):
+       streamed = b''.join(api.stream_predictions(PREDICTIONS, self.output_file))
+       self.assertEqual(orjson.loads(streamed), self.assertPublished())
+
+   def test_empty(self):
+       streamed = b''.join(api.stream_predictions([], self.output_file))
+       self.assertEqual(orjson.loads(streamed), {'predictions': {}})
+       self.assertEqual(orjson.loads(self.output_file.read_bytes()), {'predictions': {}})
+
+   def test_aborted_stream_still_publishes(self):
+       stream = api.stream_predictions(PREDICTIONS, self.output_file)
+       next(stream)
+       stream.close()  # client hung up after the first date bucket
+       self.assertPublished()
+
+   def test_failed_stream_leaves_nothing_behind(self):
+       broken = PREDICTIONS + [('2025-01-03', [object()])]
+       with self.assertRaises(TypeError):
+           b''.join(api.stream_predictions(broken, self.output_file))
+       self.assertEqual(os.listdir(self.tmp.name), [])
+
+class PredictValidationTest(unittest.TestCase):
+   def setUp(self):
+       # validation runs before the model is touched
+       patcher = mock.patch.object(api, 'initialize_predictor', return_value=True)
+       patcher.start()
+       self.addCleanup(patcher.stop)
+       self.client = api.app.test_client()
+
+   def test_missing_field(self):
+       record = {
+           'timestamp': '2025-01-01 00:00:00', 'temperature': 25.5, 'humidity': 38,
+           'wind_speed': 29, 'precipitation': 2.0, 'vegetation_index': 52,
+           'human_activity_index': 22, 'latitude': 44.4577, 'longitude': -72.1008
+       }
+       partial = dict(record)
+       del partial['humidity']
+       response = self.client.post('/api/predict', json={'environmental_data': [record, partial]})
+       self.assertEqual(response.status_code, 400)
+       self.assertEqual(response.get_json(), {
+           'error': 'Missing required fields in environmental_data',
+           'missing_fields': ['humidity']
+       })
+
+   def test_records_not_a_list(self):
+       response = self.client.post('/api/predict', json={'environmental_data': {'temperature': 1}})
+       self.assertEqual(response.status_code, 400)
+       self.assertEqual(response.get_json()['error'], 'environmental_data must be a list of records')
+
+if __name__ == '__main__':
+   unittest.main()
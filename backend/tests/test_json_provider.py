@@ -0,0 +1,50 @@
+# the orjson provider keeps the json the stdlib provider used to produce
+# run from backend/: python -m unittest discover tests
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+import orjson
+from flask import jsonify
+
+from api import app
+from json_provider import dumps_bytes
+from p1_models import Severity, WildfireEvent
+
+class SeverityTest(unittest.TestCase):
+   def test_event_severity_is_a_string(self):
+       now = datetime(2024, 7, 1, 12)
+       event = WildfireEvent(now, now, (49.0, -120.0), Severity.MEDIUM)
+       self.assertEqual(orjson.loads(dumps_bytes(event.to_dict()))['severity'], 'medium')
+
+   def test_response_severities_are_strings(self):
+       # processing writes output/, keep it out of the checkout
+       tmp = tempfile.TemporaryDirectory()
+       self.addCleanup(tmp.cleanup)
+       self.addCleanup(os.chdir, os.getcwd())
+       os.chdir(tmp.name)
+       events = [
+           {'timestamp': '2024-07-01T12:00:00', 'fire_start_time': '2024-07-01T11:30:00',
+            'location': '49.0,-120.0', 'severity': severity}
+           for severity in ('low', 'Medium', 'HIGH')
+       ]
+       response = app.test_client().post('/api/p1/process_uploaded_data', json={'events': events})
+       self.assertEqual(response.status_code, 200)
+       state = response.get_json()['system_state']
+       self.assertEqual(sorted(event['severity'] for event in state['events']), ['high', 'low', 'medium'])
+       self.assertEqual(set(state['damage_costs']), {'low', 'medium', 'high'})
+       self.assertEqual(set(state['statistics']['addressed']), {'low', 'medium', 'high'})
+
+class NonStrKeyTest(unittest.TestCase):
+   def test_int_keys_coerced(self):
+       self.assertEqual(orjson.loads(dumps_bytes({1: 'a', 2.5: 'b'})), {'1': 'a', '2.5': 'b'})
+
+   def test_jsonify_int_keys(self):
+       with app.app_context():
+           response = jsonify({2024: [1, 2]})
+       self.assertEqual(response.mimetype, 'application/json')
+       self.assertEqual(response.get_json(), {'2024': [1, 2]})
+
+if __name__ == '__main__':
+   unittest.main()
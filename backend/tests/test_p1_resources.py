@@ -0,0 +1,47 @@
+# plan_assignments against the one-event-at-a-time greedy pick
+# run from backend/: python -m unittest discover tests
+import unittest
+
+from p1_models import Severity
+from p1_resources import ResourcePool
+
+def _greedy_picks(pool, n_events):
+   """the old per-event loop: cheapest free resource, then take a unit of it"""
+   picks = []
+   for _ in range(n_events):
+       name = pool.get_best_available_resource(Severity.HIGH)
+       if name is not None:
+           pool.assign_resource(name)
+       picks.append(name)
+   return picks
+
+class PlanAssignmentsTest(unittest.TestCase):
+   def check(self, custom_resources, n_events):
+       planned = ResourcePool(custom_resources).plan_assignments(n_events)
+       self.assertEqual(planned, _greedy_picks(ResourcePool(custom_resources), n_events))
+       return planned
+
+   def test_matches_greedy_pick(self):
+       for n_events in (0, 1, 5, 10, 27):
+           self.check(None, n_events)
+
+   def test_pool_runs_dry(self):
+       # default pool has 28 units - the rest of the queue gets no resource
+       planned = self.check(None, 40)
+       self.assertNotIn(None, planned[:28])
+       self.assertEqual(planned[28:], [None] * 12)
+
+   def test_partly_used_and_tied_costs(self):
+       custom = {
+           "fire_engines": {"cost": 2000, "total_units": 3, "used_units": 2},
+           "ground_crews": {"cost": 2000, "total_units": 2},  # ties keep pool order
+           "helicopters": {"cost": 8000, "total_units": 1, "used_units": 1},  # already out
+           "over_used": {"cost": 1, "total_units": 1, "used_units": 4},
+       }
+       planned = self.check(custom, 30)
+       self.assertEqual(planned[:3], ["fire_engines", "ground_crews", "ground_crews"])
+       self.assertNotIn("over_used", planned)
+       self.assertEqual(planned[-1], None)
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,37 @@
+# damage cost handling of WildfireResponseSystem
+# run from backend/: python -m unittest discover tests
+import copy
+import unittest
+from datetime import datetime
+
+from p1_models import Severity, WildfireEvent
+from p1_system import DEFAULT_DAMAGE_COSTS, WildfireResponseSystem
+
+def _event(severity):
+   now = datetime(2024, 7, 1, 12)
+   return WildfireEvent(now, now, (49.0, -120.0), severity)
+
+class DamageCostTest(unittest.TestCase):
+   def setUp(self):
+       self.system = WildfireResponseSystem(enable_console_print=False)
+
+   def test_assigned_costs_used_for_missed_responses(self):
+       self.system.damage_costs = {Severity.HIGH: 7}
+
+       # partial mapping - the other severities keep their defaults
+       self.assertEqual(self.system.damage_costs[Severity.HIGH], 7)
+       self.assertEqual(self.system.damage_costs[Severity.LOW], DEFAULT_DAMAGE_COSTS[Severity.LOW])
+
+       self.system._handle_missed_response(_event(Severity.HIGH))
+       self.system._handle_missed_response(_event(Severity.LOW))
+       self.assertEqual(self.system.missed_response_costs, 7 + DEFAULT_DAMAGE_COSTS[Severity.LOW])
+
+   def test_deepcopy(self):
+       self.system.damage_costs = {Severity.MEDIUM: 3}
+       clone = copy.deepcopy(self.system)
+       self.assertEqual(clone.damage_costs, self.system.damage_costs)
+       clone._handle_missed_response(_event(Severity.MEDIUM))
+       self.assertEqual(clone.missed_response_costs, 3)
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,63 @@
+# the FWI code functions and fwi_recurrence against the scalar _*_step references
+# run from backend/: python -m unittest discover tests
+import unittest
+
+import numpy as np
+
+import p2_fwi as fwi
+
+class RecurrenceStepTest(unittest.TestCase):
+   def test_vectorized_functions_match_recurrence(self):
+       rng = np.random.default_rng(0)
+       n = 500
+       weather = np.column_stack([
+           rng.uniform(-10, 40, n),                           # temperature
+           rng.uniform(5, 100, n),                            # humidity
+           rng.uniform(0, 60, n),                             # wind
+           rng.choice([0.0, 0.0, 0.3, 1.0, 2.0, 5.0, 20.0], n),  # rain
+       ]).astype(np.float32)
+       temp, rh, wind, rain = weather.T
+       fwi.clip_weather(temp, rh, wind, rain)
+       months = rng.integers(1, 13, n)
+       
+       codes = np.empty((3, n))
+       codes[:, 0] = 85.0, 6.0, 15.0
+       ffmc, dmc, dc = codes
+       fwi.fwi_recurrence(temp, rh, wind, rain, months, ffmc, dmc, dc)
+       
+       # same update one day at a time through the public functions (these
+       # work in float64, the recurrence precomputes its terms in float32)
+       for i in range(1, n):
+           step = (temp[i], rh[i], wind[i], rain[i])
+           self.assertAlmostEqual(fwi.calculate_ffmc_vectorized(*step, ffmc[i - 1]), ffmc[i], places=3)
+           self.assertAlmostEqual(fwi.calculate_dmc_vectorized(temp[i], rh[i], rain[i], dmc[i - 1], months[i]), dmc[i], places=3)
+           self.assertAlmostEqual(fwi.calculate_dc_vectorized(temp[i], rain[i], dc[i - 1], months[i]), dc[i], places=3)
+
+   def test_vectorized_functions_match_scalar_steps(self):
+       rng = np.random.default_rng(1)
+       n = 2000
+       temp = rng.uniform(-10, 40, n)
+       rh = rng.uniform(5, 100, n)
+       wind = rng.uniform(0, 60, n)
+       rain = rng.choice([0.0, 0.3, 1.0, 2.0, 5.0, 20.0], n)
+       months = rng.integers(1, 13, n).astype(np.float64)
+       prev_ffmc = rng.uniform(0, 101, n)
+       prev_dmc = rng.uniform(0, 200, n)  # covers all three b-factor buckets
+       prev_dc = rng.uniform(0, 800, n)
+       
+       ffmc = fwi.calculate_ffmc_vectorized(temp, rh, wind, rain, prev_ffmc)
+       dmc = fwi.calculate_dmc_vectorized(temp, rh, rain, prev_dmc, months)
+       dc = fwi.calculate_dc_vectorized(temp, rain, prev_dc, months)
+       
+       month_idx = fwi._month_index(months)
+       with np.errstate(divide='ignore', invalid='ignore'):
+           ffmc_terms = fwi._ffmc_terms(temp, rh, wind, rain)
+       dmc_terms = fwi._dmc_terms(temp, rh, rain, month_idx)
+       dc_terms = fwi._dc_terms(temp, rain, month_idx)
+       for i in range(n):
+           self.assertAlmostEqual(ffmc[i], fwi._ffmc_step(prev_ffmc[i], *(t[i] for t in ffmc_terms)), places=9)
+           self.assertAlmostEqual(dmc[i], fwi._dmc_step(prev_dmc[i], *(t[i] for t in dmc_terms)), places=9)
+           self.assertAlmostEqual(dc[i], fwi._dc_step(prev_dc[i], *(t[i] for t in dc_terms)), places=9)
+
+if __name__ == '__main__':
+   unittest.main()
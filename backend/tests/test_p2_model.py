@@ -0,0 +1,57 @@
+# regression tests for WildfirePredictor on frames read back from parquet
+# run from backend/: python -m unittest discover tests
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from p2_data_prep import prepare_data
+from p2_model import WildfirePredictor
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+def _float_env_csv(path, nrows=200):
+   """sample of the future env data w/ every column written as floats, so
+   the prepared frame keeps all features in a single float64 block"""
+   env_df = pd.read_csv(BACKEND_DIR / 'data' / 'future_environmental_data.csv', nrows=nrows)
+   numeric = env_df.columns.drop('timestamp')
+   env_df[numeric] = env_df[numeric].astype(np.float64)
+   env_df.to_csv(path, index=False, float_format='%.2f')
+
+class ParquetFrameTest(unittest.TestCase):
+   def setUp(self):
+       self.tmp = tempfile.TemporaryDirectory()
+       self.csv_path = Path(self.tmp.name) / 'env.csv'
+       _float_env_csv(self.csv_path)
+   
+   def tearDown(self):
+       self.tmp.cleanup()
+   
+   def test_predict_on_cache_hit(self):
+       predictor = WildfirePredictor()
+       predictor.load_model(BACKEND_DIR / 'models')
+       fresh = predictor.predict(prepare_data(self.csv_path, None))
+       cached = predictor.predict(prepare_data(self.csv_path, None))  # read back from parquet
+       np.testing.assert_array_equal(cached['fire_probability'], fresh['fire_probability'])
+   
+   def test_scaling_leaves_frame_untouched(self):
+       predictor = WildfirePredictor()
+       predictor.load_model(BACKEND_DIR / 'models')
+       prepare_data(self.csv_path, None)
+       df = pd.read_parquet(self.csv_path.with_suffix('.fwi.parquet'))
+       before = df[predictor.feature_cols].to_numpy(copy=True)
+       predictor._scale_features(df)
+       np.testing.assert_array_equal(df[predictor.feature_cols].to_numpy(), before)
+   
+   def test_train_on_parquet_frame(self):
+       prepare_data(self.csv_path, None)
+       df = pd.read_parquet(self.csv_path.with_suffix('.fwi.parquet'))
+       df['fire_occurred'] = (np.arange(len(df)) % 10 == 0).astype(np.int8)
+       predictor = WildfirePredictor()
+       predictor.train(df)
+       self.assertEqual(len(predictor.predict(df)), len(df))
+
+if __name__ == '__main__':
+   unittest.main()